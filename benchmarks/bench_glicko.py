@@ -0,0 +1,138 @@
+#! /usr/bin/env python
+import time
+from collections import defaultdict
+
+import click
+import glicko2
+import numpy
+import pandas
+from skelo.model.glicko2 import Glicko2Estimator as SkeloGlicko2Estimator
+
+from bench_period_grouper import synthetic_games
+from yomi_skill.glicko import Glicko2Estimator
+from yomi_skill.model import _dynamic_period_grouper
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def skelo_ratings(games, **params):
+    estimator = SkeloGlicko2Estimator(**params).fit(games, games.win)
+    ratings = estimator.rating_model.transform(
+        games[params["key1_field"]].to_numpy(),
+        games[params["key2_field"]].to_numpy(),
+        games[params["timestamp_field"]].to_numpy(),
+    )
+    return pandas.DataFrame(
+        [(*r1, *r2) for (r1, r2) in ratings],
+        columns=["r1", "rd1", "v1", "r2", "rd2", "v2"],
+        index=games.index,
+    ).assign(prob=estimator.transform(games))
+
+
+def reference_period_ratings(games, rating_period_field, **params):
+    # Scalar Glicko-2 with the glicko2 package that skelo uses, rating each
+    # period's games together and growing the deviation of every player who
+    # sits out a period
+    key1_field, key2_field = params["key1_field"], params["key2_field"]
+    players = {}
+
+    def rating(key):
+        player = players.get(key)
+        if player is None:
+            return params["initial_value"]
+        return (player.getRating(), player.getRd(), player.vol)
+
+    rows = {}
+    for _, period in games.groupby(rating_period_field, sort=True):
+        results = defaultdict(list)
+        for idx, key_1, key_2, win in zip(
+            period.index, period[key1_field], period[key2_field], period.win
+        ):
+            rating_1, rating_2 = rating(key_1), rating(key_2)
+            rows[idx] = (*rating_1, *rating_2)
+            results[key_1].append((rating_2[0], rating_2[1], float(win)))
+            results[key_2].append((rating_1[0], rating_1[1], 1 - float(win)))
+        updated = {}
+        for key, opponents in results.items():
+            player = glicko2.Player(*rating(key))
+            ratings, deviations, outcomes = zip(*opponents)
+            player.update_player(list(ratings), list(deviations), list(outcomes))
+            updated[key] = player
+        for key, player in players.items():
+            if key not in updated:
+                player.did_not_compete()
+        players.update(updated)
+
+    ratings = pandas.DataFrame.from_dict(
+        rows, orient="index", columns=["r1", "rd1", "v1", "r2", "rd2", "v2"]
+    ).loc[games.index]
+    return ratings.assign(
+        prob=Glicko2Estimator.compute_prob(
+            ratings[["r1", "rd1", "v1"]].to_numpy(),
+            ratings[["r2", "rd2", "v2"]].to_numpy(),
+        )
+    )
+
+
+def native_ratings(games, **params):
+    return Glicko2Estimator(**params).fit(games, games.win).transform(games)
+
+
+@click.command()
+@click.option("--games", "sizes", multiple=True, type=int, default=[10_000, 100_000])
+@click.option("--skip-skelo-above", type=int, default=None)
+def main(sizes, skip_skelo_above):
+    print(
+        f"{'games':>10} {'field':>18} {'skelo (s)':>10} {'native (s)':>11} "
+        f"{'periods (s)':>12} {'max diff':>10} {'periods diff':>13}"
+    )
+    for n_games in sizes:
+        games = synthetic_games(n_games)
+        games = games[games.player_1 != games.player_2].reset_index(drop=True)
+        games["win"] = numpy.random.default_rng(0).random(len(games)) < 0.5
+        for field_prefix, threshold, initial_value in [
+            ("player", 1, (1500.0, 50, 0.059)),
+            ("player_character", 3, (1500.0, 40, 0.027)),
+        ]:
+            params = dict(
+                key1_field=f"{field_prefix}_1",
+                key2_field=f"{field_prefix}_2",
+                timestamp_field="match_date",
+                initial_value=initial_value,
+                initial_time=games.match_date.min(),
+            )
+            native, native_time = timed(native_ratings, games, **params)
+
+            games["period_idx"] = _dynamic_period_grouper(
+                games, threshold=threshold, field_prefix=field_prefix
+            ).period_idx
+            periods, periods_time = timed(
+                native_ratings, games, rating_period_field="period_idx", **params
+            )
+
+            if skip_skelo_above is not None and n_games > skip_skelo_above:
+                skelo_time = max_diff = periods_diff = float("nan")
+            else:
+                skelo, skelo_time = timed(skelo_ratings, games, **params)
+                max_diff = (native - skelo).abs().to_numpy().max()
+                numpy.testing.assert_allclose(native, skelo, rtol=1e-6, atol=1e-6)
+                # skelo has no rating periods, so check those against a
+                # per-period reference instead
+                reference = reference_period_ratings(
+                    games, rating_period_field="period_idx", **params
+                )
+                periods_diff = (periods - reference).abs().to_numpy().max()
+                numpy.testing.assert_allclose(periods, reference, rtol=1e-6, atol=1e-6)
+            print(
+                f"{n_games:>10} {field_prefix:>18} {skelo_time:>10.3f} "
+                f"{native_time:>11.3f} {periods_time:>12.3f} {max_diff:>10.2g} "
+                f"{periods_diff:>13.2g}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+#! /usr/bin/env python
+import time
+from decimal import Decimal
+
+import click
+import numpy
+import pandas
+
+from yomi_skill.nash import Nash
+
+
+def synthetic_chart(n_characters, seed=0):
+    rng = numpy.random.default_rng(seed)
+    characters = [f"character_{idx:02d}" for idx in range(n_characters)]
+    win_rates = rng.uniform(0.3, 0.7, (n_characters, n_characters))
+    # Each matchup is the reverse of its mirror, and mirrors are even
+    win_rates = (win_rates + (1 - win_rates.T)) / 2
+    return pandas.Series(
+        win_rates.ravel(),
+        index=pandas.MultiIndex.from_product(
+            [characters, characters], names=["c1", "c2"]
+        ),
+    )
+
+
+class DecimalCounterpicks:
+    # The original recursive Decimal implementation, for comparison
+    def __init__(self, nash):
+        self.mu_chart = nash.mu_chart
+        self.characters = nash.characters
+        self._payoffs = {}
+        self._games_played = {}
+
+    def payoff(self, p1_playing, p1_req, p2_playing, p2_req):
+        key = (p1_playing, p1_req, p2_playing, p2_req)
+
+        if p1_req == 0:
+            return Decimal(1)
+        if p2_req == 0:
+            return Decimal(0)
+
+        if key not in self._payoffs:
+            p1_win_chance = self.mu_chart.loc[p1_playing, p2_playing]
+            p1_win_rec = min(
+                self.payoff(p1_playing, p1_req - 1, new_cp, p2_req)
+                for new_cp in self.characters
+            )
+            p2_win_rec = max(
+                self.payoff(new_cp, p1_req, p2_playing, p2_req - 1)
+                for new_cp in self.characters
+            )
+            self._payoffs[key] = (
+                p1_win_chance * p1_win_rec + (1 - p1_win_chance) * p2_win_rec
+            )
+
+        return self._payoffs[key]
+
+    def games_played(self, mu, p1_playing, p1_req, p2_playing, p2_req):
+        key = (mu, p1_playing, p1_req, p2_playing, p2_req)
+
+        if p1_req == 0:
+            return Decimal(0)
+        if p2_req == 0:
+            return Decimal(0)
+
+        if key not in self._games_played:
+            p1_win_chance = self.mu_chart.loc[p1_playing, p2_playing]
+            _, p2_cp = min(
+                (self.payoff(p1_playing, p1_req - 1, new_cp, p2_req), new_cp)
+                for new_cp in self.characters
+            )
+            p2_played_rec = self.games_played(mu, p1_playing, p1_req - 1, p2_cp, p2_req)
+            _, p1_cp = max(
+                (self.payoff(new_cp, p1_req, p2_playing, p2_req - 1), new_cp)
+                for new_cp in self.characters
+            )
+            p1_played_rec = self.games_played(mu, p1_cp, p1_req, p2_playing, p2_req - 1)
+            played_one = 1 if mu == (p1_playing, p2_playing) else 0
+
+            self._games_played[key] = (
+                played_one
+                + p1_win_chance * p2_played_rec
+                + (1 - p1_win_chance) * p1_played_rec
+            )
+
+        return self._games_played[key]
+
+
+def decimal_win_rate(nash, best_of):
+    wins_required = (best_of + 1) // 2
+    reference = DecimalCounterpicks(nash)
+    return pandas.Series(
+        [
+            float(reference.payoff(c1, wins_required, c2, wins_required))
+            for c1, c2 in nash.mu_chart.index
+        ],
+        index=nash.mu_chart.index,
+    )
+
+
+def decimal_matchup_counts(nash, best_of):
+    wins_required = (best_of + 1) // 2
+    reference = DecimalCounterpicks(nash)
+    expected_r1 = nash.expected_r1_mus(best_of)
+    return pandas.Series(
+        [
+            float(
+                sum(
+                    reference.games_played(
+                        matchup, p1, wins_required, p2, wins_required
+                    )
+                    * Decimal(expected)
+                    for ((p1, p2), expected) in expected_r1
+                )
+            )
+            for matchup in nash.mu_chart.index
+        ],
+        index=nash.mu_chart.index,
+    )
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+@click.command()
+@click.option("--characters", "sizes", multiple=True, type=int, default=[10, 20])
+@click.option("--best-of", type=int, default=7)
+def main(sizes, best_of):
+    print(f"{'characters':>10} {'step':>14} {'decimal (s)':>12} {'tensor (s)':>11}")
+    for n_characters in sizes:
+        chart = synthetic_chart(n_characters)
+        expected, decimal_time = timed(decimal_win_rate, Nash(chart), best_of)
+        actual, tensor_time = timed(Nash(chart).win_rate, best_of)
+        numpy.testing.assert_allclose(actual, expected, atol=1e-12)
+        print(
+            f"{n_characters:>10} {'win_rate':>14} {decimal_time:>12.3f} "
+            f"{tensor_time:>11.4f}"
+        )
+
+        # Solve the equilibria outside of the timings
+        decimal_nash, tensor_nash = Nash(chart), Nash(chart)
+        decimal_nash.blind_pick_nash_eq(best_of)
+        tensor_nash.blind_pick_nash_eq(best_of)
+        expected, decimal_time = timed(decimal_matchup_counts, decimal_nash, best_of)
+        actual, tensor_time = timed(tensor_nash.matchup_counts, best_of)
+        numpy.testing.assert_allclose(actual.loc[expected.index], expected, atol=1e-9)
+        print(
+            f"{n_characters:>10} {'matchup_counts':>14} {decimal_time:>12.3f} "
+            f"{tensor_time:>11.4f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
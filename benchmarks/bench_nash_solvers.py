@@ -0,0 +1,75 @@
+#! /usr/bin/env python
+import time
+
+import click
+import numpy
+
+from bench_nash import synthetic_chart
+from yomi_skill.nash import (
+    blind_pick_equilibria,
+    constant_sum_payoffs,
+    counterpick_payoffs,
+)
+
+
+def synthetic_games(n_games, n_characters, best_of, seed=0):
+    chart = synthetic_chart(n_characters, seed=seed)
+    characters = chart.index.levels[0].values
+    rng = numpy.random.default_rng(seed)
+    # Jitter the chart in logit space, as posterior draws would
+    logits = numpy.log(chart.to_numpy() / (1 - chart.to_numpy())).reshape(
+        n_characters, n_characters
+    )
+    noise = rng.normal(0, 0.1, (n_games, n_characters, n_characters))
+    noise = (noise - noise.transpose(0, 2, 1)) / 2
+    charts = 1 / (1 + numpy.exp(-(logits + noise)))
+    wins_required = (best_of + 1) // 2
+    rates = constant_sum_payoffs(
+        characters,
+        counterpick_payoffs(charts, wins_required)[wins_required, wins_required],
+    )
+    # Both solvers see the payoffs gambit is given
+    return rates.round(4)
+
+
+def game_values(rates, picks):
+    return numpy.einsum("gi,gij->gj", picks, rates).min(axis=1)
+
+
+@click.command()
+@click.option("--games", "sizes", multiple=True, type=int, default=[100, 1000])
+@click.option("--characters", type=int, default=20)
+@click.option("--best-of", type=int, default=7)
+def main(sizes, characters, best_of):
+    print(
+        f"{'games':>8} {'gambit (s)':>11} {'linprog (s)':>12} "
+        f"{'max value diff':>15} {'max pick diff':>14}"
+    )
+    for n_games in sizes:
+        rates = synthetic_games(n_games, characters, best_of)
+        start = time.perf_counter()
+        expected = blind_pick_equilibria(rates, "gambit")
+        gambit_time = time.perf_counter() - start
+        start = time.perf_counter()
+        actual = blind_pick_equilibria(rates, "linprog")
+        linprog_time = time.perf_counter() - start
+
+        # Agreement: both find the same guaranteed value for player 1 in
+        # every game, and (as these games have a unique equilibrium) the
+        # same pick probabilities
+        value_diff = numpy.abs(
+            game_values(rates, expected) - game_values(rates, actual)
+        ).max()
+        pick_diff = numpy.abs(expected - actual).max()
+        numpy.testing.assert_allclose(
+            game_values(rates, actual), game_values(rates, expected), atol=1e-9
+        )
+        numpy.testing.assert_allclose(actual, expected, atol=1e-6)
+        print(
+            f"{n_games:>8} {gambit_time:>11.3f} {linprog_time:>12.3f} "
+            f"{value_diff:>15.2e} {pick_diff:>14.2e}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#! /usr/bin/env python
+import time
+
+import click
+import numpy
+import pandas
+
+from yomi_skill.games.yomi.character import character_category
+from yomi_skill.model import _dynamic_period_grouper
+
+
+def resample_period_grouper(X, threshold, field_prefix):
+    # The original day-by-day implementation of _dynamic_period_grouper
+    current_period = None
+    current_idx = 0
+
+    result = pandas.DataFrame({}, index=X.index)
+
+    for date, games in X.resample("1D", label="right", on="match_date"):
+        if current_period is None:
+            current_period = games
+        else:
+            current_period = pandas.concat([current_period, games])
+
+        player_counts = pandas.concat(
+            [current_period[f"{field_prefix}_1"], current_period[f"{field_prefix}_2"]]
+        ).value_counts()
+        played = player_counts[player_counts > 0]
+        games_played = played.mean()
+        result.loc[games.index, f"period_idx"] = current_idx
+        if games_played > threshold:
+            current_idx += 1
+            current_period = None
+    return result
+
+
+def synthetic_games(n_games, seed=0):
+    rng = numpy.random.default_rng(seed)
+    n_players = max(10, int(numpy.sqrt(n_games) * 2))
+    player_category = pandas.api.types.CategoricalDtype(
+        [f"player{idx}" for idx in range(n_players)], ordered=True
+    )
+    characters = character_category.categories.values
+
+    games = pandas.DataFrame(
+        {
+            "match_date": pandas.Timestamp("2013-06-15", tz="UTC")
+            + pandas.to_timedelta(rng.integers(0, 3 * 365 * 24 * 60, n_games), "min"),
+            "player_1": pandas.Categorical.from_codes(
+                rng.integers(0, n_players, n_games), dtype=player_category
+            ),
+            "player_2": pandas.Categorical.from_codes(
+                rng.integers(0, n_players, n_games), dtype=player_category
+            ),
+            "character_1": pandas.Categorical.from_codes(
+                rng.integers(0, len(characters), n_games), dtype=character_category
+            ),
+            "character_2": pandas.Categorical.from_codes(
+                rng.integers(0, len(characters), n_games), dtype=character_category
+            ),
+        }
+    ).sort_values("match_date", kind="stable")
+    games["player_character_1"] = (
+        games.player_1.astype(str) + "-" + games.character_1.astype(str)
+    ).astype("category")
+    games["player_character_2"] = (
+        games.player_2.astype(str) + "-" + games.character_2.astype(str)
+    ).astype("category")
+    return games
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+@click.command()
+@click.option(
+    "--games", "sizes", multiple=True, type=int, default=[10_000, 100_000, 1_000_000]
+)
+@click.option("--skip-resample-above", type=int, default=None)
+def main(sizes, skip_resample_above):
+    print(f"{'games':>10} {'field':>18} {'resample (s)':>14} {'single pass (s)':>16}")
+    for n_games in sizes:
+        games = synthetic_games(n_games)
+        for field_prefix, threshold in [("player", 1), ("player_character", 3)]:
+            current, current_time = timed(
+                _dynamic_period_grouper,
+                games,
+                threshold=threshold,
+                field_prefix=field_prefix,
+            )
+            if skip_resample_above is not None and n_games > skip_resample_above:
+                resample_time = float("nan")
+            else:
+                reference, resample_time = timed(
+                    resample_period_grouper,
+                    games,
+                    threshold=threshold,
+                    field_prefix=field_prefix,
+                )
+                pandas.testing.assert_series_equal(
+                    current.period_idx, reference.period_idx
+                )
+            print(
+                f"{n_games:>10} {field_prefix:>18} "
+                f"{resample_time:>14.3f} {current_time:>16.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
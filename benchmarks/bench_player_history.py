@@ -0,0 +1,97 @@
+#! /usr/bin/env python
+import hashlib
+import json
+import time
+import tracemalloc
+
+import click
+import numpy
+import simplejson
+
+from bench_render import synthetic_render
+from yomi_skill.render import _history_chunks
+
+
+def synthetic_histories(n_games, seed=0):
+    render = synthetic_render(n_games, seed=seed)
+    data = render.model.data_
+    rng = numpy.random.default_rng(seed)
+    data["render__win"] = rng.integers(0, 2, len(data))
+    # Ratings that haven't been computed yet, and columns that are never set
+    for column in ["glicko__r1", "pc_glicko__rd2"]:
+        data.loc[rng.random(len(data)) < 0.05, column] = numpy.nan
+    data["pc_elo__r1_unused"] = None
+    return render.player_histories
+
+
+def dumps_history(history, compact):
+    # The original implementation, via to_json and back
+    if compact:
+        split = json.loads(
+            history.to_json(orient="split", index=False, double_precision=3)
+        )
+        data = {
+            column: [row[idx] for row in split["data"]]
+            for idx, column in enumerate(split["columns"])
+        }
+        text = simplejson.dumps(
+            data, separators=(",", ":"), sort_keys=True, ignore_nan=True
+        )
+    else:
+        data = json.loads(history.to_json(orient="records", double_precision=3))
+        text = simplejson.dumps(data, indent=2, sort_keys=True, ignore_nan=True)
+    return hashlib.md5(text.encode()).hexdigest()
+
+
+def stream_history(history, compact):
+    digest = hashlib.md5()
+    for chunk in _history_chunks(history, compact):
+        digest.update(chunk.encode())
+    return digest.hexdigest()
+
+
+def measure(fn, histories, compact):
+    start = time.perf_counter()
+    digests = [fn(history, compact) for history in histories]
+    seconds = time.perf_counter() - start
+    # Tracing slows everything down, so measure memory in a separate pass
+    peak = 0
+    for history in histories:
+        tracemalloc.start()
+        fn(history, compact)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return digests, seconds, peak
+
+
+@click.command()
+@click.option("--games", "sizes", multiple=True, type=int, default=[100_000])
+@click.option("--players", type=int, default=350)
+def main(sizes, players):
+    print(
+        f"{'games':>10} {'format':>8} {'to_json (s)':>12} {'streamed (s)':>13} "
+        f"{'to_json peak (MB)':>18} {'streamed peak (MB)':>19}"
+    )
+    for n_games in sizes:
+        grouped = synthetic_histories(n_games)
+        histories = [
+            grouped.get_group(player).sort_values("render__match_date")
+            for player in list(grouped.groups)[:players]
+        ]
+        for compact in [False, True]:
+            expected, dumps_time, dumps_peak = measure(
+                dumps_history, histories, compact
+            )
+            actual, stream_time, stream_peak = measure(
+                stream_history, histories, compact
+            )
+            assert expected == actual
+            print(
+                f"{n_games:>10} {'compact' if compact else 'records':>8} "
+                f"{dumps_time:>12.3f} {stream_time:>13.3f} "
+                f"{dumps_peak / 2**20:>18.1f} {stream_peak / 2**20:>19.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#! /usr/bin/env python
+import time
+from types import SimpleNamespace
+
+import click
+import numpy
+import pandas
+
+from bench_period_grouper import synthetic_games
+from yomi_skill.render import YomiRender
+
+
+def synthetic_render(n_games, seed=0):
+    rng = numpy.random.default_rng(seed)
+    games = synthetic_games(n_games, seed=seed).sort_values("match_date")
+    data = pandas.DataFrame(
+        {
+            "render__match_date": games.match_date,
+            "render__public": rng.random(n_games) < 0.9,
+            "min_games__player_1_orig": games.player_1,
+            "min_games__player_2_orig": games.player_2,
+            "matchup__character_1": games.character_1,
+            "matchup__character_2": games.character_2,
+            **{
+                f"{system}__r{side}": rng.normal(1500, 200, n_games)
+                for system in ["elo", "glicko", "pc_elo", "pc_glicko"]
+                for side in [1, 2]
+            },
+            **{
+                f"{system}__rd{side}": rng.uniform(30, 350, n_games)
+                for system in ["glicko", "pc_glicko"]
+                for side in [1, 2]
+            },
+            **{
+                f"{system}__v{side}": rng.uniform(0.02, 0.07, n_games)
+                for system in ["glicko", "pc_glicko"]
+                for side in [1, 2]
+            },
+        }
+    ).reset_index(drop=True)
+    return YomiRender({"model": SimpleNamespace(data_=data)}, data_root=None)
+
+
+# The original per-group implementations, for comparison
+
+
+def loop_player_character_ratings_devs(render):
+    return {
+        (player, character): pandas.concat([pandas.Series([0]), matches["pc_elo"]])
+        .rolling(50, min_periods=0)
+        .std()
+        .iloc[-1]
+        for (player, character), matches in render.player_character_ratings_history
+    }
+
+
+def loop_player_ratings_devs(render):
+    return {
+        player: pandas.concat([pandas.Series([0]), matches["elo"]])
+        .rolling(30, min_periods=1)
+        .std()
+        .iloc[-1]
+        for player, matches in render.player_ratings_history
+    }
+
+
+def loop_top_glicko_by_character(render):
+    return {
+        character: [
+            {
+                "player": player,
+                "r": round(row.pc_glicko_r, 0),
+                "rd": round(row.pc_glicko_rd, 2),
+                "v": round(row.pc_glicko_v, 3),
+            }
+            for (player, _), row in pc_ratings.sort_values(
+                "pc_glicko_r", ascending=False, kind="stable"
+            )
+            .head(20)
+            .iterrows()
+        ]
+        for character, pc_ratings in render.player_character_ratings_history.last()
+        .loc[render.public_players, :]
+        .dropna(subset=["pc_glicko_r"])
+        .groupby("character")
+    }
+
+
+def assert_devs_equal(expected, actual):
+    # Only compare the groups that were played in
+    expected = {key: value for key, value in expected.items() if key in actual}
+    assert expected.keys() == actual.keys()
+    keys = list(expected)
+    numpy.testing.assert_allclose(
+        [expected[key] for key in keys], [actual[key] for key in keys], rtol=1e-9
+    )
+
+
+def assert_equal(expected, actual):
+    assert expected == actual
+
+
+BENCHMARKS = {
+    "player_character_ratings_devs": (
+        loop_player_character_ratings_devs,
+        assert_devs_equal,
+    ),
+    "player_ratings_devs": (loop_player_ratings_devs, assert_devs_equal),
+    "top_glicko_by_character": (loop_top_glicko_by_character, assert_equal),
+}
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+@click.command()
+@click.option("--games", "sizes", multiple=True, type=int, default=[10_000, 100_000])
+@click.option(
+    "--benchmark", "names", multiple=True, type=click.Choice(list(BENCHMARKS))
+)
+def main(sizes, names):
+    print(f"{'games':>10} {'property':>30} {'loop (s)':>10} {'vectorized (s)':>15}")
+    for n_games in sizes:
+        for name in names or BENCHMARKS:
+            loop, check = BENCHMARKS[name]
+            render = synthetic_render(n_games)
+            # Build the shared ratings histories outside of the timings
+            render.player_character_ratings_history
+            render.player_ratings_history
+            expected, loop_time = timed(loop, render)
+            actual, vectorized_time = timed(getattr, render, name)
+            check(expected, actual)
+            print(
+                f"{n_games:>10} {name:>30} {loop_time:>10.3f} "
+                f"{vectorized_time:>15.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1,7 @@
-from .historical_record import latest_tournament_games, sirlin_db, augment_dataset
+from .historical_record import (
+    SIRLIN_DB,
+    augment_dataset,
+    frozen_tournament_games,
+    latest_tournament_games,
+    sirlin_db,
+)
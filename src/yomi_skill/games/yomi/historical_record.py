@@ -13,6 +13,7 @@ from skelo.model.elo import EloEstimator
 from .character import character_category, Character
 
 HISTORICAL_GSHEET = "https://docs.google.com/spreadsheets/u/1/d/1HcdISgCl3s4RpWkJa8m-G1JjfKzd8qf2WY2Xcw32D7U/export?format=csv&id=1HcdISgCl3s4RpWkJa8m-G1JjfKzd8qf2WY2Xcw32D7U&gid=1371955398"
+SIRLIN_DB = "yomi_results_ranked_2013-06-15_to_2015-09-07.sqlite"
 ELO_GSHEET = "https://docs.google.com/spreadsheets/d/e/2PACX-1vR5wMDB9AXwmC8N1UEcbbkNNbCcUdnhOmsFRyrXCU8huErk20zKeULEVdAidCijMUc678oOC1F7tgUI/pub?gid=1688184901&single=true&output=csv"
 
 
@@ -285,6 +286,14 @@ def cached_tournament_games() -> pandas.DataFrame:
     return pandas.read_parquet(f"{game_dir}/{picked}")
 
 
+def frozen_tournament_games(refresh=False) -> pandas.DataFrame:
+    # Yomi 1 tournaments are over, so a previously fetched record is as good
+    # as a new one
+    if not refresh and os.path.isdir("games/yomi") and os.listdir("games/yomi"):
+        return cached_tournament_games()
+    return latest_tournament_games()
+
+
 def parse_game_results(result):
     if result.endswith("dc"):
         return None
@@ -292,7 +301,7 @@ def parse_game_results(result):
 
 
 def sirlin_db() -> pandas.DataFrame:
-    con = sqlite3.connect("yomi_results_ranked_2013-06-15_to_2015-09-07.sqlite")
+    con = sqlite3.connect(SIRLIN_DB)
     df = pandas.read_sql_query("SELECT * from yomi_results", con)
     char_map = {
         0: Character.Grave.value,
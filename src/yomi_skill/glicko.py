@@ -0,0 +1,365 @@
+import logging
+from collections.abc import Mapping
+
+import numpy
+import pandas
+from sklearn.base import BaseEstimator, TransformerMixin
+
+logger = logging.getLogger(__name__)
+
+# Conversion between the Glicko and Glicko-2 rating scales
+GLICKO2_SCALE = 173.7178
+TAU = 0.5
+EPSILON = 0.000001
+OUTPUT_COLUMNS = ["r1", "rd1", "v1", "r2", "rd2", "v2", "prob"]
+
+
+def _g(phi):
+    return 1 / numpy.sqrt(1 + 3 * phi**2 / numpy.pi**2)
+
+
+def _timestamps(values):
+    values = pandas.Series(values)
+    if pandas.api.types.is_datetime64_any_dtype(values):
+        # NaT becomes the smallest int64, so it sorts before every rating
+        return values.array.asi8
+    return values.to_numpy(float)
+
+
+def _new_volatility(mu, phi, sigma, v, delta):
+    # Vectorized version of the volatility iteration in the glicko2 package
+    # that skelo uses, including its use of mu (rather than phi) inside f, so
+    # that ratings match skelo's
+    a = numpy.log(sigma**2)
+
+    def f(x):
+        ex = numpy.exp(x)
+        return (ex * (delta**2 - mu**2 - v - ex)) / (
+            2 * (mu**2 + v + ex) ** 2
+        ) - (x - a) / TAU**2
+
+    big_delta = delta**2 > phi**2 + v
+    B = numpy.log(numpy.where(big_delta, delta**2 - phi**2 - v, 1.0))
+    k = numpy.ones_like(a)
+    searching = ~big_delta
+    while searching.any():
+        searching[searching] = f(a - k * TAU)[searching] < 0
+        k[searching] += 1
+    B = numpy.where(big_delta, B, a - k * TAU)
+
+    A = a
+    fA = f(A)
+    fB = f(B)
+    active = numpy.abs(B - A) > EPSILON
+    while active.any():
+        C = A + (A - B) * fA / (fB - fA)
+        fC = f(C)
+        bracketed = fC * fB <= 0
+        A = numpy.where(active & bracketed, B, A)
+        fA = numpy.where(active, numpy.where(bracketed, fB, fA / 2), fA)
+        B = numpy.where(active, C, B)
+        fB = numpy.where(active, fC, fB)
+        active = numpy.abs(B - A) > EPSILON
+    return numpy.exp(A / 2)
+
+
+def _update(ratings, players, opponents, outcomes):
+    """
+    Glicko-2 update of ``ratings`` (in place, on the Glicko-2 scale) for every
+    player in ``players``, using each of their results against ``opponents``
+    (as rated at the start of the period). Returns the updated players.
+    """
+    updated, index = numpy.unique(players, return_inverse=True)
+    mu, phi, sigma = ratings[updated].T
+    opponent_mu, opponent_phi, _ = ratings[opponents].T
+
+    g = _g(opponent_phi)
+    expected = 1 / (1 + numpy.exp(-g * (mu[index] - opponent_mu)))
+    v = 1 / numpy.bincount(index, weights=g**2 * expected * (1 - expected))
+    score = numpy.bincount(index, weights=g * (outcomes - expected))
+
+    sigma = _new_volatility(mu, phi, sigma, v, v * score)
+    phi = 1 / numpy.sqrt(1 / (phi**2 + sigma**2) + 1 / v)
+    ratings[updated] = numpy.column_stack([mu + phi**2 * score, phi, sigma])
+    return updated
+
+
+def _sit_out(ratings, players, period, started, last_rated):
+    """
+    Grow the deviation of each started player in ``players`` (in place) for
+    each rating period before ``period`` that they didn't play in, as
+    Glicko-2 does for players who don't compete. Volatility doesn't change
+    while a player sits out, so the periods can be applied all at once.
+    """
+    idle = numpy.where(started[players], period - last_rated[players] - 1, 0)
+    ratings[players, 1] = numpy.sqrt(
+        ratings[players, 1] ** 2 + idle * ratings[players, 2] ** 2
+    )
+
+
+def _conflict_free_batches(key_1, key_2):
+    # Without rating periods, every game is rated on its own, in order. Games
+    # that share no players don't affect each other, so group runs of those
+    # together to be updated at once
+    batches = numpy.empty(len(key_1), dtype=int)
+    last_batch = {}
+    batch = 0
+    start = 0
+    for idx, (k1, k2) in enumerate(zip(key_1, key_2)):
+        if last_batch.get(k1, -1) >= start or last_batch.get(k2, -1) >= start:
+            batch += 1
+            start = idx
+        last_batch[k1] = last_batch[k2] = idx
+        batches[idx] = batch
+    return batches
+
+
+class Glicko2Estimator(BaseEstimator, TransformerMixin):
+    """
+    Glicko-2 ratings with the same interface and outputs as skelo's
+    ``Glicko2Estimator``, keeping ratings in arrays indexed by player code and
+    rating all games in a rating period at once.
+
+    Each game is transformed into the ratings of both players (and player 1's
+    win probability) as of strictly before the game. When
+    ``rating_period_field`` is set, ratings change at the end of each rating
+    period, based on all of the games in it, and the deviation of every
+    player who has been rated before (or given an initial rating) grows for
+    each period they sit out. Otherwise, each game is its own rating period,
+    and (as in skelo) idle players' deviations don't grow.
+    """
+
+    def __init__(
+        self,
+        key1_field=None,
+        key2_field=None,
+        timestamp_field=None,
+        initial_value=(1500.0, 350.0, 0.06),
+        initial_time=0,
+        rating_period_field=None,
+        initial_ratings=None,
+    ):
+        self.key1_field = key1_field
+        self.key2_field = key2_field
+        self.timestamp_field = timestamp_field
+        self.initial_value = initial_value
+        self.initial_time = initial_time
+        self.rating_period_field = rating_period_field
+        self.initial_ratings = initial_ratings
+
+    def _initial_ratings(self):
+        if self.initial_ratings is None:
+            return pandas.DataFrame(columns=["r", "rd", "v"], dtype=float)
+        if isinstance(self.initial_ratings, pandas.DataFrame):
+            return self.initial_ratings[["r", "rd", "v"]]
+        if isinstance(self.initial_ratings, Mapping):
+            return pandas.DataFrame.from_dict(
+                {
+                    key: (
+                        # skelo-style rating histories
+                        value[-1]["rating"]
+                        if isinstance(value, list)
+                        else value
+                    )
+                    for key, value in self.initial_ratings.items()
+                },
+                orient="index",
+                columns=["r", "rd", "v"],
+            )
+        raise ValueError(f"Unsupported initial_ratings {type(self.initial_ratings)}")
+
+    def fit(self, X, y):
+        initial = self._initial_ratings()
+        self.keys_ = pandas.Index(
+            pandas.concat(
+                [
+                    initial.index.to_series(),
+                    X[self.key1_field].astype(object),
+                    X[self.key2_field].astype(object),
+                ]
+            )
+            .dropna()
+            .unique()
+        ).sort_values()
+        key_1 = self.keys_.get_indexer(X[self.key1_field])
+        key_2 = self.keys_.get_indexer(X[self.key2_field])
+        timestamps = _timestamps(X[self.timestamp_field])
+        outcomes = numpy.asarray(y, dtype=float)
+
+        ratings = numpy.empty((len(self.keys_), 3))
+        ratings[:] = self.initial_value
+        ratings[self.keys_.get_indexer(initial.index)] = initial.to_numpy(float)
+        self.initial_ratings_ = ratings.copy()
+        # Work on the Glicko-2 scale
+        ratings[:, 0] = (ratings[:, 0] - 1500) / GLICKO2_SCALE
+        ratings[:, 1] = ratings[:, 1] / GLICKO2_SCALE
+
+        # A game against yourself says nothing about your rating
+        rated = (key_1 >= 0) & (key_2 >= 0) & (key_1 != key_2)
+        period_mode = self.rating_period_field is not None
+        if not period_mode:
+            order = numpy.lexsort((key_2, key_1, timestamps))
+            order = order[rated[order]]
+            periods = _conflict_free_batches(key_1[order], key_2[order])
+        else:
+            period_idx = X[self.rating_period_field].to_numpy(float)
+            rated &= ~numpy.isnan(period_idx)
+            order = numpy.flatnonzero(rated)
+            order = order[numpy.argsort(period_idx[order], kind="stable")]
+            _, periods = numpy.unique(period_idx[order], return_inverse=True)
+        if (timestamps[order] < _timestamps([self.initial_time])[0]).any():
+            raise ValueError(
+                f"Attempted to rate games from before initial_time {self.initial_time}"
+            )
+
+        period_starts = numpy.flatnonzero(numpy.diff(periods, prepend=-1))
+        period_ends = numpy.append(period_starts[1:], len(order))
+
+        # The last rating period each player was rated in, with -1 for
+        # players with an initial rating, so that the periods they sat out
+        # can be applied when they next play
+        started = numpy.zeros(len(self.keys_), dtype=bool)
+        started[self.keys_.get_indexer(initial.index)] = period_mode
+        self.initial_started_ = started.copy()
+        last_rated = numpy.full(len(self.keys_), -1)
+
+        history_keys = []
+        history_times = []
+        history_periods = []
+        history_ratings = []
+        period_times = []
+        for period, (start, end) in enumerate(zip(period_starts, period_ends)):
+            games = order[start:end]
+            players = numpy.concatenate([key_1[games], key_2[games]])
+            if period_mode:
+                _sit_out(ratings, numpy.unique(players), period, started, last_rated)
+            updated = _update(
+                ratings,
+                players,
+                numpy.concatenate([key_2[games], key_1[games]]),
+                numpy.concatenate([outcomes[games], 1 - outcomes[games]]),
+            )
+            # New ratings take effect after the player's last game in the
+            # batch, or at the end of the rating period
+            if not period_mode:
+                valid_from = numpy.full(len(updated), timestamps[games].min())
+                numpy.maximum.at(
+                    valid_from,
+                    numpy.searchsorted(updated, players),
+                    numpy.concatenate([timestamps[games], timestamps[games]]),
+                )
+            else:
+                valid_from = numpy.full(len(updated), timestamps[games].max())
+                period_times.append(valid_from[0])
+                started[updated] = True
+                last_rated[updated] = period
+            history_keys.append(updated)
+            history_times.append(valid_from)
+            history_periods.append(numpy.full(len(updated), period))
+            history_ratings.append(ratings[updated].copy())
+
+        # Periods end in the order they were rated, so the number of periods
+        # that ended before a game can be found with searchsorted
+        self.period_times_ = numpy.array(period_times, dtype=timestamps.dtype)
+        if period_mode:
+            _sit_out(
+                ratings,
+                numpy.arange(len(self.keys_)),
+                len(period_starts),
+                started,
+                last_rated,
+            )
+        self.ratings_ = self._to_frame(ratings, self.keys_)
+        self._set_history(
+            numpy.concatenate(history_keys or [numpy.empty(0, int)]),
+            numpy.concatenate(history_times or [numpy.empty(0, int)]),
+            numpy.concatenate(history_periods or [numpy.empty(0, int)]),
+            numpy.concatenate(history_ratings or [numpy.empty((0, 3))]),
+        )
+        return self
+
+    def _set_history(self, keys, times, periods, ratings):
+        # Sort the rating history by player, then time (keeping the update
+        # order for ties), so that the latest rating for a player before a
+        # given time can be found with a single searchsorted
+        self.history_times_ = numpy.unique(times)
+        positions = numpy.searchsorted(self.history_times_, times)
+        composite = keys * (len(self.history_times_) + 1) + positions
+        order = numpy.argsort(composite, kind="stable")
+        self.history_composite_ = composite[order]
+        self.history_keys_ = keys[order]
+        self.history_periods_ = periods[order]
+        self.history_ratings_ = ratings[order]
+        self.history_ratings_[:, 0] = self.history_ratings_[:, 0] * GLICKO2_SCALE + 1500
+        self.history_ratings_[:, 1] = self.history_ratings_[:, 1] * GLICKO2_SCALE
+
+    def _ratings_at(self, keys, timestamps):
+        codes = self.keys_.get_indexer(keys)
+        ratings = numpy.empty((len(codes), 3))
+        ratings[:] = self.initial_value
+        known = codes >= 0
+        ratings[known] = self.initial_ratings_[codes[known]]
+
+        # Only use ratings from strictly before each game
+        positions = numpy.searchsorted(self.history_times_, timestamps, side="left")
+        composite = codes * (len(self.history_times_) + 1) + positions
+        latest = numpy.searchsorted(self.history_composite_, composite) - 1
+        found = (
+            known
+            & (latest >= 0)
+            & (self.history_keys_[numpy.maximum(latest, 0)] == codes)
+        )
+        ratings[found] = self.history_ratings_[latest[found]]
+
+        if self.rating_period_field is not None:
+            # Grow the deviation for each period the player sat out between
+            # their latest rating and the game
+            ended = numpy.searchsorted(self.period_times_, timestamps, side="left")
+            last_rated = numpy.where(
+                found, self.history_periods_[numpy.maximum(latest, 0)], -1
+            )
+            started = found | (known & self.initial_started_[numpy.maximum(codes, 0)])
+            idle = numpy.where(started, numpy.maximum(ended - last_rated - 1, 0), 0)
+            ratings[:, 1] = GLICKO2_SCALE * numpy.sqrt(
+                (ratings[:, 1] / GLICKO2_SCALE) ** 2 + idle * ratings[:, 2] ** 2
+            )
+        return ratings
+
+    def transform(self, X):
+        timestamps = _timestamps(X[self.timestamp_field])
+        ratings_1 = self._ratings_at(X[self.key1_field], timestamps)
+        ratings_2 = self._ratings_at(X[self.key2_field], timestamps)
+        return pandas.DataFrame(
+            numpy.column_stack(
+                [ratings_1, ratings_2, self.compute_prob(ratings_1, ratings_2)]
+            ),
+            columns=OUTPUT_COLUMNS,
+            index=X.index,
+        )
+
+    @staticmethod
+    def compute_prob(ratings_1, ratings_2):
+        # The same formula as skelo, including applying g() on the Glicko scale
+        r_diff = (ratings_2[:, 0] - ratings_1[:, 0]) / 400.0
+        root_square_std = numpy.sqrt(ratings_1[:, 1] ** 2 + ratings_2[:, 1] ** 2)
+        return 1.0 / (1 + 10 ** (_g(ratings_1[:, 1]) * root_square_std * r_diff))
+
+    def predict_proba(self, X):
+        prob = self.transform(X).prob.to_numpy()
+        return numpy.column_stack([prob, 1 - prob])
+
+    def predict(self, X):
+        return self.transform(X).prob.to_numpy() > 0.5
+
+    def get_feature_names_out(self, input_features=None):
+        return numpy.array(OUTPUT_COLUMNS, dtype=object)
+
+    def _to_frame(self, ratings, index):
+        return pandas.DataFrame(
+            {
+                "r": ratings[:, 0] * GLICKO2_SCALE + 1500,
+                "rd": ratings[:, 1] * GLICKO2_SCALE,
+                "v": ratings[:, 2],
+            },
+            index=index,
+        )
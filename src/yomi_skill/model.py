@@ -45,6 +45,22 @@ def weight_by(games, key):
     return games
 
 
+def aggregate_wins(X, y):
+    # Collapse games with identical model inputs into (wins, trials) rows.
+    # The render__ columns are only carried along for output, so they aren't
+    # part of what makes two games identical.
+    covariates = [col for col in X.columns if not col.startswith("render__")]
+    group = (
+        X.groupby(covariates, observed=True, dropna=False, sort=False)
+        .ngroup()
+        .to_numpy()
+    )
+    _, first = numpy.unique(group, return_index=True)
+    wins = numpy.bincount(group, weights=y).astype(int)
+    trials = numpy.bincount(group)
+    return X.iloc[first], wins, trials
+
+
 def _transform_min_games(X, min_games=0):
     logger.info("Starting _transform_min_games")
     result = pandas.DataFrame(
@@ -91,20 +107,58 @@ def _transform_min_games(X, min_games=0):
 min_games_transformer = FunctionTransformer(_transform_min_games)
 
 
-def _transform_matchup(X):
-    logger.info("Starting _transform_matchup")
-    characters = X.character_1.dtype.categories.values
+def _category_codes(series, categories):
+    if isinstance(
+        series.dtype, pandas.api.types.CategoricalDtype
+    ) and series.dtype.categories.equals(categories):
+        codes = series.cat.codes.to_numpy()
+    else:
+        codes = pandas.Categorical(series, categories=categories).codes
+    # Widen from int8 so that pair codes can be computed without overflow
+    return codes.astype(numpy.int64)
+
+
+def _pair_categorical(pair_codes, labels, index, *codes):
+    # Rows where any component is missing (or the pair isn't a category) get NaN
+    pair_codes = numpy.where(
+        numpy.logical_and.reduce([c >= 0 for c in codes]), pair_codes, -1
+    )
+    return pandas.Series(
+        pandas.Categorical.from_codes(
+            pair_codes,
+            dtype=pandas.api.types.CategoricalDtype(labels, ordered=True),
+        ),
+        index=index,
+    )
+
+
+def matchup_categorical(character_1, character_2):
+    characters = character_1.dtype.categories
     mu_list = [
         f"{c1}-{c2}"
         for (o1, c1) in enumerate(characters)
         for (o2, c2) in enumerate(characters)
         if o1 <= o2
     ]
+    char_1 = _category_codes(character_1, characters)
+    char_2 = _category_codes(character_2, characters)
+    n_chars = len(characters)
+    # Position of (char_1, char_2) in the row-major upper triangle of mu_list
+    mu_codes = char_1 * n_chars - char_1 * (char_1 - 1) // 2 + (char_2 - char_1)
+    return _pair_categorical(
+        numpy.where(char_1 <= char_2, mu_codes, -1),
+        mu_list,
+        character_1.index,
+        char_1,
+        char_2,
+    )
+
+
+def _transform_matchup(X):
+    logger.info("Starting _transform_matchup")
     df = pandas.DataFrame(
         {
-            "mup": X[["character_1", "character_2"]]
-            .agg("-".join, axis=1)
-            .astype(pandas.api.types.CategoricalDtype(mu_list, ordered=True)),
+            "mup": matchup_categorical(X.character_1, X.character_2),
             "character_1": X.character_1,
             "character_2": X.character_2,
             "non_mirror": (X.character_1 != X.character_2).astype(int),
@@ -119,26 +173,29 @@ matchup_transformer = FunctionTransformer(_transform_matchup)
 
 def _transform_gem_effect(X):
     logger.info("Starting _transform_gem_effect")
-    characters = X.character_1.dtype.categories.values
-    gems = X.gem_1.dtype.categories.values
-    print(characters, gems)
+    characters = X.character_1.dtype.categories
+    gems = X.gem_1.dtype.categories
     with_gem_list = [f"{c}-{g}" for c in characters for g in gems]
     against_gem_list = [f"{g}-{c}" for c in characters for g in gems]
-    print(X[["character_1", "gem_1"]])
+    char_1 = _category_codes(X.character_1, characters)
+    char_2 = _category_codes(X.character_2, characters)
+    gem_1 = _category_codes(X.gem_1, gems)
+    gem_2 = _category_codes(X.gem_2, gems)
+    n_gems = len(gems)
     df = pandas.DataFrame(
         {
-            "with_gem_1": X[["character_1", "gem_1"]]
-            .agg("-".join, axis=1)
-            .astype(pandas.api.types.CategoricalDtype(with_gem_list, ordered=True)),
-            "with_gem_2": X[["character_2", "gem_2"]]
-            .agg("-".join, axis=1)
-            .astype(pandas.api.types.CategoricalDtype(with_gem_list, ordered=True)),
-            "against_gem_1": X[["gem_1", "character_2"]]
-            .agg("-".join, axis=1)
-            .astype(pandas.api.types.CategoricalDtype(against_gem_list, ordered=True)),
-            "against_gem_2": X[["gem_2", "character_1"]]
-            .agg("-".join, axis=1)
-            .astype(pandas.api.types.CategoricalDtype(against_gem_list, ordered=True)),
+            "with_gem_1": _pair_categorical(
+                char_1 * n_gems + gem_1, with_gem_list, X.index, char_1, gem_1
+            ),
+            "with_gem_2": _pair_categorical(
+                char_2 * n_gems + gem_2, with_gem_list, X.index, char_2, gem_2
+            ),
+            "against_gem_1": _pair_categorical(
+                char_2 * n_gems + gem_1, against_gem_list, X.index, char_2, gem_1
+            ),
+            "against_gem_2": _pair_categorical(
+                char_1 * n_gems + gem_2, against_gem_list, X.index, char_1, gem_2
+            ),
             "gem_1": X.gem_1,
             "gem_2": X.gem_2,
             "character_1": X.character_1,
@@ -161,33 +218,116 @@ def _render(X):
 render_transformer = FunctionTransformer(_render)
 
 
-def _dynamic_period_grouper(X, threshold, field_prefix):
-    current_period = None
-    current_idx = 0
+def _joint_codes(key_1, key_2):
+    # Code both key columns against a shared vocabulary, with missing keys as -1
+    if (
+        isinstance(key_1.dtype, pandas.api.types.CategoricalDtype)
+        and key_1.dtype == key_2.dtype
+    ):
+        return (
+            key_1.cat.codes.to_numpy(),
+            key_2.cat.codes.to_numpy(),
+            len(key_1.dtype.categories),
+        )
 
-    result = pandas.DataFrame({}, index=X.index)
+    if isinstance(key_1.dtype, pandas.api.types.CategoricalDtype) and isinstance(
+        key_2.dtype, pandas.api.types.CategoricalDtype
+    ):
+        joined = pandas.api.types.union_categoricals(
+            [key_1.array, key_2.array], ignore_order=True
+        )
+        codes, n_keys = joined.codes, len(joined.categories)
+    else:
+        codes, uniques = pandas.factorize(
+            numpy.concatenate([key_1.to_numpy(), key_2.to_numpy()])
+        )
+        n_keys = len(uniques)
+    return codes[: len(key_1)], codes[len(key_1) :], n_keys
 
-    for date, games in X.resample("1D", label="right", on="match_date"):
-        if current_period is None:
-            current_period = games
-        else:
-            current_period = pandas.concat([current_period, games])
-
-        player_counts = pandas.concat(
-            [current_period[f"{field_prefix}_1"], current_period[f"{field_prefix}_2"]]
-        ).value_counts()
-        played = player_counts[player_counts > 0]
-        games_played = played.mean()
-        result.loc[games.index, f"period_idx"] = current_idx
-        if games_played > threshold:
+
+def _dynamic_period_grouper(X, threshold, field_prefix):
+    # Accumulate whole days into a rating period until the keys seen in that
+    # period have played more than `threshold` games on average.
+    key_1, key_2, n_keys = _joint_codes(X[f"{field_prefix}_1"], X[f"{field_prefix}_2"])
+    days, _ = pandas.factorize(X.match_date.dt.normalize(), sort=True)
+
+    dated = numpy.flatnonzero(days >= 0)
+    order = dated[numpy.argsort(days[dated], kind="stable")]
+    day_starts = numpy.flatnonzero(numpy.diff(days[order], prepend=-1))
+    day_ends = numpy.append(day_starts[1:], len(order))
+
+    period_idx = numpy.full(len(X), numpy.nan)
+    # The period in which each key was last seen, so that starting a new
+    # period doesn't require clearing any per-key state
+    last_seen = numpy.full(n_keys, -1)
+    current_idx = 0
+    appearances = 0
+    distinct_keys = 0
+
+    for start, end in zip(day_starts, day_ends):
+        games = order[start:end]
+        keys = numpy.concatenate([key_1[games], key_2[games]])
+        keys = keys[keys >= 0]
+        new_keys = numpy.unique(keys[last_seen[keys] != current_idx])
+        last_seen[new_keys] = current_idx
+        appearances += len(keys)
+        distinct_keys += len(new_keys)
+
+        period_idx[games] = current_idx
+        if distinct_keys and appearances / distinct_keys > threshold:
             current_idx += 1
-            current_period = None
-    return result
+            appearances = 0
+            distinct_keys = 0
+
+    return pandas.DataFrame({"period_idx": period_idx}, index=X.index)
 
 
 dynamic_period_transformer = FunctionTransformer(_dynamic_period_grouper)
 
 
+def _label_positions(index, labels):
+    if isinstance(labels, pandas.Series):
+        labels = labels.array
+    if isinstance(getattr(labels, "dtype", None), pandas.api.types.CategoricalDtype):
+        # Look up each category once, with missing values (code -1) mapping to
+        # the trailing -1
+        positions = numpy.append(index.get_indexer(labels.categories), -1)
+        return positions[numpy.asarray(labels.codes)]
+    return index.get_indexer(labels)
+
+
+def label_positions(array: xarray.DataArray, **labels) -> tuple:
+    """
+    Positions of arrays of coordinate labels along each labelled dimension of
+    ``array`` (in the order of its dimensions), with -1 where a label isn't a
+    coordinate.
+    """
+    return tuple(
+        _label_positions(array.indexes[dim], labels[dim])
+        for dim in array.dims
+        if dim in labels
+    )
+
+
+def take_positions(values: numpy.ndarray, positions: tuple) -> numpy.ndarray:
+    """
+    ``values`` at arrays of positions (one per dimension), with NaN where a
+    position is -1.
+    """
+    found = numpy.logical_and.reduce([position >= 0 for position in positions])
+    return numpy.where(
+        found, values[tuple(numpy.maximum(p, 0) for p in positions)], numpy.nan
+    )
+
+
+def lookup(array: xarray.DataArray, **labels) -> numpy.ndarray:
+    """
+    Values of ``array`` at arrays of coordinate labels (one per dimension),
+    with NaN where a label isn't a coordinate.
+    """
+    return take_positions(array.to_numpy(), label_positions(array, **labels))
+
+
 class YomiModel(ABC, BaseEstimator, ClassifierMixin):
     model_name: str
     model_hash: str
@@ -230,6 +370,11 @@ class YomiModel(ABC, BaseEstimator, ClassifierMixin):
     def p1_win_chance(self, X: pandas.DataFrame) -> pandas.DataFrame:
         pass
 
+    def win_chance_frame(self, X, prob_p1_win):
+        return pandas.DataFrame(
+            {1: prob_p1_win, 0: 1 - prob_p1_win}, columns=self.classes_, index=X.index
+        )
+
     def predict_proba(self, X):
         prob_a = self.p1_win_chance(X).to_numpy()
         return prob_a
@@ -6,6 +6,7 @@ from scipy.special import expit, logit
 import xarray
 import numpy
 
+from ..model import matchup_categorical, lookup
 from .pymc_model import PyMCModel
 
 
@@ -27,46 +28,31 @@ class CharSkillGlickoSkillDeficit(PyMCModel):
             win_chance_logit = pm.Deterministic(
                 "win_chance_logit",
                 char_skill[
-                    self.data_.character_ix_1,
-                    self.data_.player_ix_1,
+                    self.model_data_.character_ix_1,
+                    self.model_data_.player_ix_1,
                 ]
                 - char_skill[
-                    self.data_.character_ix_2,
-                    self.data_.player_ix_2,
+                    self.model_data_.character_ix_2,
+                    self.model_data_.player_ix_2,
                 ]
-                + self.data_.non_mirror.to_numpy(int) * mu[self.data_.mup.to_numpy(int)]
-                + glicko_logit_scale * self.data_.skglicko_logit,
+                + self.model_data_.non_mirror.to_numpy(int)
+                * mu[self.model_data_.mup.to_numpy(int)]
+                + glicko_logit_scale * self.model_data_.skglicko_logit,
             )
-            win_lik = pm.Bernoulli(
-                "win_lik",
+            win_lik = self.win_lik_m(
                 logit_p=win_chance_logit,
-                observed=self.y_,
             )
         return model
 
     def p1_win_chance(self, X: pandas.DataFrame) -> pandas.DataFrame:
-        mean_skill = self.fill_untrained_players(
-            self.inf_data_["posterior"].char_skill.mean(["chain", "draw"]), X
-        )
-        skill1 = X.aggregate(
-            lambda x: float(mean_skill.sel(character=x.character_1, player=x.player_1)),
-            axis=1,
-        )
-        skill2 = X.aggregate(
-            lambda x: float(mean_skill.sel(character=x.character_2, player=x.player_2)),
-            axis=1,
-        )
+        mean_skill = self.fill_untrained_players(self.posterior_mean("char_skill"), X)
+        skill1 = lookup(mean_skill, character=X.character_1, player=X.player_1)
+        skill2 = lookup(mean_skill, character=X.character_2, player=X.player_2)
         non_mirror = (X.character_1 != X.character_2).astype(int)
-        matchup_value = self.inf_data_["posterior"].mu.mean(["chain", "draw"])
-        matchup = X.aggregate(
-            lambda x: float(
-                matchup_value.sel(matchup=f"{x.character_1}-{x.character_2}")
-            ),
-            axis=1,
-        )
-        glicko_logit_scale = float(
-            self.inf_data_["posterior"].glicko_logit_scale.mean(["chain", "draw"])
+        matchup = self.posterior_mean_at(
+            "mu", matchup=matchup_categorical(X.character_1, X.character_2)
         )
+        glicko_logit_scale = float(self.posterior_summary["glicko_logit_scale"].mean)
         prob_p1_win = expit(
             skill1
             - skill2
@@ -74,6 +60,4 @@ class CharSkillGlickoSkillDeficit(PyMCModel):
             + (glicko_logit_scale * logit(X.glicko_estimate))
         )
 
-        return pandas.DataFrame(
-            {1: prob_p1_win, 0: 1 - prob_p1_win}, columns=self.classes_
-        )
+        return self.win_chance_frame(X, prob_p1_win)
@@ -10,7 +10,11 @@ from skelo.model.glicko2 import Glicko2Estimator
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 
-from ..model import matchup_transformer, min_games_transformer, render_transformer
+from ..model import (
+    matchup_transformer,
+    min_games_transformer,
+    render_transformer,
+)
 from .pymc_model import PyMCModel
 
 
@@ -19,7 +23,7 @@ class CustomGlicko(PyMCModel):
     weight_key = "pc_glicko"
 
     @classmethod
-    def pipeline(cls, memory=None, verbose=False, **params):
+    def pipeline(cls, memory=None, verbose=False, n_jobs=None, **params):
         return Pipeline(
             [
                 (
@@ -65,6 +69,7 @@ class CustomGlicko(PyMCModel):
                             ),
                         ],
                         remainder="drop",
+                        n_jobs=n_jobs,
                     ),
                 ),
                 ("model", cls()),
@@ -77,49 +82,48 @@ class CustomGlicko(PyMCModel):
     def model_(self):
         with pm.Model(
             coords={
-                "matchup": self.data_.matchup__mup.dtype.categories.values,
-                "player": self.data_.min_games__player_1.dtype.categories.values,
+                "matchup": self.model_data_.matchup__mup.dtype.categories.values,
+                "player": self.model_data_.min_games__player_1.dtype.categories.values,
             }
         ) as model:
-            ratings_delta = self.data_.glicko__r1 - self.data_.glicko__r2
-            norm_deviation = self.data_.glicko__rd1**2 + self.data_.glicko__rd2**2
+            ratings_delta = self.model_data_.glicko__r1 - self.model_data_.glicko__r2
+            norm_deviation = (
+                self.model_data_.glicko__rd1**2 + self.model_data_.glicko__rd2**2
+            )
             deviation_scale = pm.HalfNormal("deviation_scale", sigma=1.0)
             g_deviation = ((deviation_scale * norm_deviation) + 1) ** (-0.5)
             rating_scale = pm.HalfNormal("rating_scale", sigma=1.0)
 
-            pc_ratings_delta = self.data_.pc_glicko__r1 - self.data_.pc_glicko__r2
+            pc_ratings_delta = (
+                self.model_data_.pc_glicko__r1 - self.model_data_.pc_glicko__r2
+            )
             pc_norm_deviation = (
-                self.data_.pc_glicko__rd1**2 + self.data_.pc_glicko__rd2**2
+                self.model_data_.pc_glicko__rd1**2 + self.model_data_.pc_glicko__rd2**2
             )
             pc_deviation_scale = pm.HalfNormal("pc_deviation_scale", sigma=1.0)
             pc_g_deviation = ((pc_deviation_scale * pc_norm_deviation) + 1) ** (-0.5)
             pc_rating_scale = pm.HalfNormal("pc_rating_scale", sigma=1.0)
 
-            win_lik = pm.Bernoulli(
-                "win_lik",
+            win_lik = self.win_lik_m(
                 logit_p=self.mu_logit_m
                 + (rating_scale * g_deviation * ratings_delta)
                 + (pc_rating_scale * pc_g_deviation * pc_ratings_delta),
-                observed=self.y_,
             )
             self.weighted_m(win_lik)
         return model
 
     def p1_win_chance(self, X: pandas.DataFrame) -> pandas.DataFrame:
-        posterior = self.inf_data_["posterior"].mean(["chain", "draw"])
+        summary = self.posterior_summary
 
-        matchup_value = posterior.mu
-        matchup = matchup_value.sel(matchup=X.matchup__mup.to_numpy())
+        matchup = summary.lookup("mu", matchup=X.matchup__mup)
         mu_logit = X.matchup__non_mirror * matchup
 
         ratings_delta = X.glicko__r1 - X.glicko__r2
         norm_deviation = X.glicko__rd1**2 + X.glicko__rd2**2
-        deviation_scale = float(posterior.deviation_scale)
+        deviation_scale = float(summary["deviation_scale"].mean)
         g_deviation = ((deviation_scale * norm_deviation) + 1) ** (-0.5)
-        rating_scale = float(posterior.rating_scale)
+        rating_scale = float(summary["rating_scale"].mean)
 
         prob_p1_win = expit(mu_logit + (rating_scale * g_deviation * ratings_delta))
 
-        return pandas.DataFrame(
-            {1: prob_p1_win, 0: 1 - prob_p1_win}, columns=self.classes_
-        )
+        return self.win_chance_frame(X, prob_p1_win)
@@ -10,7 +10,11 @@ from skelo.model.elo import EloEstimator
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 
-from ..model import matchup_transformer, min_games_transformer, render_transformer
+from ..model import (
+    matchup_transformer,
+    min_games_transformer,
+    render_transformer,
+)
 from .pymc_model import PyMCModel
 
 
@@ -19,7 +23,7 @@ class Full(PyMCModel):
     weight_key = "pc_elo"
 
     @classmethod
-    def pipeline(cls, memory=None, verbose=False, **params):
+    def pipeline(cls, memory=None, verbose=False, n_jobs=None, **params):
         return Pipeline(
             [
                 (
@@ -65,6 +69,7 @@ class Full(PyMCModel):
                             ),
                         ],
                         remainder="drop",
+                        n_jobs=n_jobs,
                     ),
                 ),
                 ("model", cls()),
@@ -76,32 +81,26 @@ class Full(PyMCModel):
     @cached_property
     def model_(self):
         with pm.Model() as model:
-            win_lik = pm.Bernoulli(
-                "win_lik",
+            win_lik = self.win_lik_m(
                 logit_p=self.mu_logit_m
                 + self.global_pc_elo_estimate_logit_m
                 + self.global_elo_estimate_logit_m,
-                observed=self.y_,
             )
             self.weighted_m(win_lik)
         return model
 
     def p1_win_chance(self, X: pandas.DataFrame) -> pandas.DataFrame:
-        posterior = self.inf_data_["posterior"].mean(["chain", "draw"])
+        summary = self.posterior_summary
 
-        matchup_value = posterior.mu
-        matchup = X.aggregate(
-            lambda x: float(matchup_value.sel(matchup=x.matchup__mup)),
-            axis=1,
-        )
+        matchup = summary.lookup("mu", matchup=X.matchup__mup)
 
-        pc_elo_estimate_logit = float(posterior.pc_elo_scale) * logit(X.pc_elo__prob)
-        elo_estimate_logit = float(posterior.elo_scale) * logit(X.elo__prob)
+        pc_elo_estimate_logit = float(summary["pc_elo_scale"].mean) * logit(
+            X.pc_elo__prob
+        )
+        elo_estimate_logit = float(summary["elo_scale"].mean) * logit(X.elo__prob)
 
         mu_logit = X.matchup__non_mirror * matchup
 
         prob_p1_win = expit(mu_logit + pc_elo_estimate_logit + elo_estimate_logit)
 
-        return pandas.DataFrame(
-            {1: prob_p1_win, 0: 1 - prob_p1_win}, columns=self.classes_
-        )
+        return self.win_chance_frame(X, prob_p1_win)
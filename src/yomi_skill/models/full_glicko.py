@@ -10,7 +10,11 @@ from skelo.model.glicko2 import Glicko2Estimator
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 
-from ..model import matchup_transformer, min_games_transformer, render_transformer
+from ..model import (
+    matchup_transformer,
+    min_games_transformer,
+    render_transformer,
+)
 from .pymc_model import PyMCModel
 
 
@@ -19,7 +23,7 @@ class FullGlicko(PyMCModel):
     weight_key = "pc_glicko"
 
     @classmethod
-    def pipeline(cls, memory=None, verbose=False, **params):
+    def pipeline(cls, memory=None, verbose=False, n_jobs=None, **params):
         return Pipeline(
             [
                 (
@@ -65,6 +69,7 @@ class FullGlicko(PyMCModel):
                             ),
                         ],
                         remainder="drop",
+                        n_jobs=n_jobs,
                     ),
                 ),
                 ("model", cls()),
@@ -77,32 +82,29 @@ class FullGlicko(PyMCModel):
     def model_(self):
         with pm.Model(
             coords={
-                "matchup": self.data_.matchup__mup.dtype.categories.values,
-                "player": self.data_.min_games__player_1.dtype.categories.values,
+                "matchup": self.model_data_.matchup__mup.dtype.categories.values,
+                "player": self.model_data_.min_games__player_1.dtype.categories.values,
             }
         ) as model:
-            win_lik = pm.Bernoulli(
-                "win_lik",
+            win_lik = self.win_lik_m(
                 logit_p=self.mu_logit_m
                 + self.global_pc_glicko_estimate_logit_m
                 + self.global_glicko_estimate_logit_m,
                 # + self.pooled_pc_glicko_estimate_logit_m
                 # + self.pooled_glicko_estimate_logit_m,
-                observed=self.y_,
             )
             self.weighted_m(win_lik)
         return model
 
     def p1_win_chance(self, X: pandas.DataFrame) -> pandas.DataFrame:
-        posterior = self.inf_data_["posterior"].mean(["chain", "draw"])
+        summary = self.posterior_summary
 
-        matchup_value = posterior.mu
-        matchup = matchup_value.sel(matchup=X.matchup__mup.to_numpy())
+        matchup = summary.lookup("mu", matchup=X.matchup__mup)
 
-        global_pc_glicko_estimate_logit = float(posterior.pc_glicko_scale) * logit(
-            X.pc_glicko__prob
-        )
-        global_glicko_estimate_logit = float(posterior.glicko_scale) * logit(
+        global_pc_glicko_estimate_logit = float(
+            summary["pc_glicko_scale"].mean
+        ) * logit(X.pc_glicko__prob)
+        global_glicko_estimate_logit = float(summary["glicko_scale"].mean) * logit(
             X.glicko__prob
         )
         # player_pc_glicko_estimate_logit = (
@@ -142,6 +144,4 @@ class FullGlicko(PyMCModel):
             # + player_pc_glicko_estimate_logit
         )
 
-        return pandas.DataFrame(
-            {1: prob_p1_win, 0: 1 - prob_p1_win}, columns=self.classes_
-        )
+        return self.win_chance_frame(X, prob_p1_win)
@@ -6,26 +6,28 @@ import pymc as pm
 import pymc.math as pmmath
 import xarray
 from scipy.special import expit, logit
-from skelo.model.glicko2 import Glicko2Estimator
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import FunctionTransformer
 
+from ..glicko import Glicko2Estimator
 from ..model import (
+    label_positions,
     matchup_transformer,
     min_games_transformer,
     render_transformer,
     _dynamic_period_grouper,
 )
-from .pymc_model import PyMCModel
+from .pymc_model import DrawPredictions, PyMCModel, take_draws
 
 
-class FullGlickoNoScale(PyMCModel):
+class FullGlickoNoScale(PyMCModel, DrawPredictions):
     model_name = "full_glicko_no_scale"
     weight_key = "pc_glicko"
+    draw_variables = ["mu", "player_global_scale"]
 
     @classmethod
-    def pipeline(cls, memory=None, verbose=False, **params):
+    def pipeline(cls, memory=None, verbose=False, n_jobs=None, **params):
         return Pipeline(
             [
                 (
@@ -62,6 +64,7 @@ class FullGlickoNoScale(PyMCModel):
                                 ],
                             ),
                         ],
+                        n_jobs=n_jobs,
                     ),
                 ),
                 (
@@ -131,6 +134,7 @@ class FullGlickoNoScale(PyMCModel):
                             ),
                         ],
                         remainder="drop",
+                        n_jobs=n_jobs,
                     ),
                 ),
                 ("model", cls()),
@@ -145,27 +149,25 @@ class FullGlickoNoScale(PyMCModel):
     def model_(self):
         with pm.Model(
             coords={
-                "matchup": self.data_.matchup__mup.dtype.categories.values,
-                "player": self.data_.min_games__player_1.dtype.categories.values,
+                "matchup": self.model_data_.matchup__mup.dtype.categories.values,
+                "player": self.model_data_.min_games__player_1.dtype.categories.values,
             }
         ) as model:
             player_global_scale = pm.Uniform("player_global_scale", upper=1, lower=0)
-            win_lik = pm.Bernoulli(
-                "win_lik",
+            win_lik = self.win_lik_m(
                 logit_p=self.mu_logit_m
-                + (player_global_scale * logit(self.data_.pc_glicko__prob))
-                + ((1 - player_global_scale) * logit(self.data_.glicko__prob)),
-                observed=self.y_,
+                + (player_global_scale * logit(self.model_data_.pc_glicko__prob))
+                + ((1 - player_global_scale) * logit(self.model_data_.glicko__prob)),
             )
             self.weighted_m(win_lik)
         return model
 
     def p1_win_chance(self, X: pandas.DataFrame) -> pandas.DataFrame:
-        posterior = self.inf_data_["posterior"].mean(["chain", "draw"])
+        summary = self.posterior_summary
 
-        matchup_value = posterior.mu
-        matchup = matchup_value.sel(matchup=X.matchup__mup.to_numpy())
+        matchup = summary.lookup("mu", matchup=X.matchup__mup)
 
+        player_global_scale = float(summary["player_global_scale"].mean)
         global_pc_glicko_estimate_logit = logit(X.pc_glicko__prob)
         global_glicko_estimate_logit = logit(X.glicko__prob)
 
@@ -173,10 +175,26 @@ class FullGlickoNoScale(PyMCModel):
 
         prob_p1_win = expit(
             mu_logit
-            + global_pc_glicko_estimate_logit * float(posterior.player_global_scale)
-            + global_glicko_estimate_logit * (1 - float(posterior.player_global_scale))
+            + global_pc_glicko_estimate_logit * player_global_scale
+            + global_glicko_estimate_logit * (1 - player_global_scale)
         )
 
-        return pandas.DataFrame(
-            {1: prob_p1_win, 0: 1 - prob_p1_win}, columns=self.classes_
+        return self.win_chance_frame(X, prob_p1_win)
+
+    def draw_inputs(self, X: pandas.DataFrame) -> dict:
+        posterior = self.inf_data_["posterior"]
+        return {
+            "matchup": label_positions(posterior.mu, matchup=X.matchup__mup)[0],
+            "non_mirror": X.matchup__non_mirror.to_numpy(float),
+            "pc_glicko_logit": logit(X.pc_glicko__prob.to_numpy(float)),
+            "glicko_logit": logit(X.glicko__prob.to_numpy(float)),
+        }
+
+    @staticmethod
+    def draw_logit(params: dict, inputs: dict):
+        player_global_scale = params["player_global_scale"][:, None]
+        return (
+            inputs["non_mirror"] * take_draws(params["mu"], inputs["matchup"])
+            + inputs["pc_glicko_logit"] * player_global_scale
+            + inputs["glicko_logit"] * (1 - player_global_scale)
         )
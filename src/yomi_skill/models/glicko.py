@@ -15,10 +15,8 @@ class Glicko(PyMCModel):
     def model_(self):
         with pm.Model() as model:
             glicko_logit_scale = pm.HalfNormal("glicko_logit_scale", sigma=1.0)
-            win_lik = pm.Bernoulli(
-                "win_lik",
-                logit_p=glicko_logit_scale * logit(self.data_.glicko_estimate),
-                observed=self.y_,
+            win_lik = self.win_lik_m(
+                logit_p=glicko_logit_scale * logit(self.model_data_.glicko_estimate),
             )
             if self.sample_weight_ is not None:
                 pm.Potential(
@@ -28,10 +26,6 @@ class Glicko(PyMCModel):
         return model
 
     def p1_win_chance(self, X: pandas.DataFrame):
-        glicko_logit_scale = float(
-            self.inf_data_["posterior"].glicko_logit_scale.mean(["chain", "draw"])
-        )
+        glicko_logit_scale = float(self.posterior_summary["glicko_logit_scale"].mean)
         prob_p1_win = expit(glicko_logit_scale * logit(X.glicko_estimate))
-        return pandas.DataFrame(
-            {1: prob_p1_win, 0: 1 - prob_p1_win}, columns=self.classes_
-        )
+        return self.win_chance_frame(X, prob_p1_win)
@@ -7,6 +7,7 @@ from scipy.special import expit, logit
 import xarray
 import numpy
 
+from ..model import matchup_categorical
 from .pymc_model import PyMCModel
 
 
@@ -19,12 +20,10 @@ class MUGlicko(PyMCModel):
         with pm.Model() as model:
             mu = pm.Normal("mu", 0.0, sigma=0.5, shape=(len(self.mu_index_),))
             glicko_logit_scale = pm.HalfNormal("glicko_logit_scale", sigma=1.0)
-            win_lik = pm.Bernoulli(
-                "win_lik",
-                logit_p=self.data_.non_mirror.to_numpy(int)
-                * mu[self.data_.mup.to_numpy(int)]
-                + glicko_logit_scale * logit(self.data_.glicko_estimate),
-                observed=self.y_,
+            win_lik = self.win_lik_m(
+                logit_p=self.model_data_.non_mirror.to_numpy(int)
+                * mu[self.model_data_.mup.to_numpy(int)]
+                + glicko_logit_scale * logit(self.model_data_.glicko_estimate),
             )
             if self.sample_weight_ is not None:
                 pm.Potential(
@@ -35,20 +34,12 @@ class MUGlicko(PyMCModel):
 
     def p1_win_chance(self, X: pandas.DataFrame) -> pandas.DataFrame:
         non_mirror = (X.character_1 != X.character_2).astype(int)
-        matchup_value = self.inf_data_["posterior"].mu.mean(["chain", "draw"])
-        matchup = X.aggregate(
-            lambda x: float(
-                matchup_value.sel(matchup=f"{x.character_1}-{x.character_2}")
-            ),
-            axis=1,
-        )
-        glicko_logit_scale = float(
-            self.inf_data_["posterior"].glicko_logit_scale.mean(["chain", "draw"])
+        matchup = self.posterior_mean_at(
+            "mu", matchup=matchup_categorical(X.character_1, X.character_2)
         )
+        glicko_logit_scale = float(self.posterior_summary["glicko_logit_scale"].mean)
         prob_p1_win = expit(
             (non_mirror * matchup) + (glicko_logit_scale * logit(X.glicko_estimate))
         )
 
-        return pandas.DataFrame(
-            {1: prob_p1_win, 0: 1 - prob_p1_win}, columns=self.classes_
-        )
+        return self.win_chance_frame(X, prob_p1_win)
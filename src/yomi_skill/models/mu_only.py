@@ -5,6 +5,7 @@ import pymc as pm
 import pymc.math as pmmath
 from scipy.special import expit
 
+from ..model import matchup_categorical
 from .pymc_model import PyMCModel
 
 
@@ -18,12 +19,11 @@ class MUOnly(PyMCModel):
             mu = pm.Normal("mu", 0.0, sigma=0.5, shape=(len(self.mu_index_),))
             win_chance_logit = pm.Deterministic(
                 "win_chance_logit",
-                +self.data_.non_mirror.to_numpy(int) * mu[self.data_.mup.to_numpy(int)],
+                +self.model_data_.non_mirror.to_numpy(int)
+                * mu[self.model_data_.mup.to_numpy(int)],
             )
-            win_lik = pm.Bernoulli(
-                "win_lik",
+            win_lik = self.win_lik_m(
                 logit_p=win_chance_logit,
-                observed=self.y_,
             )
             if self.sample_weight_ is not None:
                 pm.Potential(
@@ -34,15 +34,9 @@ class MUOnly(PyMCModel):
 
     def p1_win_chance(self, X: pandas.DataFrame) -> pandas.DataFrame:
         non_mirror = (X.character_1 != X.character_2).astype(int)
-        matchup_value = self.inf_data_["posterior"].mu.mean(["chain", "draw"])
-        matchup = X.aggregate(
-            lambda x: float(
-                matchup_value.sel(matchup=f"{x.character_1}-{x.character_2}")
-            ),
-            axis=1,
+        matchup = self.posterior_mean_at(
+            "mu", matchup=matchup_categorical(X.character_1, X.character_2)
         )
         prob_p1_win = expit((non_mirror * matchup))
 
-        return pandas.DataFrame(
-            {1: prob_p1_win, 0: 1 - prob_p1_win}, columns=self.classes_
-        )
+        return self.win_chance_frame(X, prob_p1_win)
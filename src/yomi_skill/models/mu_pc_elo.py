@@ -19,7 +19,7 @@ class MUPCElo(PyMCModel):
     weight_key = "pc_elo"
 
     @classmethod
-    def pipeline(cls, memory=None, verbose=False, **params):
+    def pipeline(cls, memory=None, verbose=False, n_jobs=None, **params):
         return Pipeline(
             [
                 (
@@ -51,6 +51,7 @@ class MUPCElo(PyMCModel):
                             ),
                         ],
                         remainder="drop",
+                        n_jobs=n_jobs,
                     ),
                 ),
                 ("model", cls()),
@@ -66,15 +67,13 @@ class MUPCElo(PyMCModel):
                 "mu",
                 0.0,
                 sigma=0.5,
-                shape=(len(self.data_.matchup__mup.dtype.categories),),
+                shape=(len(self.model_data_.matchup__mup.dtype.categories),),
             )
             elo_logit_scale = pm.HalfNormal("elo_logit_scale", sigma=1.0)
-            win_lik = pm.Bernoulli(
-                "win_lik",
-                logit_p=self.data_.matchup__non_mirror.to_numpy(int)
-                * mu[self.data_.matchup__mup]
-                + elo_logit_scale * logit(self.data_.pc_elo__prob),
-                observed=self.y_,
+            win_lik = self.win_lik_m(
+                logit_p=self.model_data_.matchup__non_mirror.to_numpy(int)
+                * mu[self.model_data_.matchup__mup]
+                + elo_logit_scale * logit(self.model_data_.pc_elo__prob),
             )
             if self.sample_weight_ is not None:
                 pm.Potential(
@@ -84,19 +83,11 @@ class MUPCElo(PyMCModel):
         return model
 
     def p1_win_chance(self, X: pandas.DataFrame) -> pandas.DataFrame:
-        matchup_value = self.inf_data_["posterior"].mu.mean(["chain", "draw"])
-        matchup = X.aggregate(
-            lambda x: float(matchup_value.sel(matchup=x.matchup__mup)),
-            axis=1,
-        )
-        elo_logit_scale = float(
-            self.inf_data_["posterior"].elo_logit_scale.mean(["chain", "draw"])
-        )
+        matchup = self.posterior_mean_at("mu", matchup=X.matchup__mup)
+        elo_logit_scale = float(self.posterior_summary["elo_logit_scale"].mean)
         prob_p1_win = expit(
             (X.matchup__non_mirror * matchup)
             + (elo_logit_scale * logit(X.pc_elo__prob))
         )
 
-        return pandas.DataFrame(
-            {1: prob_p1_win, 0: 1 - prob_p1_win}, columns=self.classes_
-        )
+        return self.win_chance_frame(X, prob_p1_win)
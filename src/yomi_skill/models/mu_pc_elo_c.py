@@ -7,6 +7,7 @@ from scipy.special import expit, logit
 import xarray
 import numpy
 
+from ..model import matchup_categorical
 from .pymc_model import PyMCModel
 
 
@@ -15,9 +16,9 @@ class MUPCEloC(PyMCModel):
     model_name = "mu_pc_elo_c"
     weight_key = "pc_elo"
 
-    def fit(self, X, y=None, sample_weight=None) -> "MUPCEloC":
+    def fit(self, X, y=None, sample_weight=None, warm_start=None) -> "MUPCEloC":
         self.pc_elo_estimate_logit_mean_ = logit(X.pc_elo_estimate).mean()
-        super().fit(X, y, sample_weight)
+        super().fit(X, y, sample_weight, warm_start)
         return self
 
     @cached_property
@@ -25,15 +26,14 @@ class MUPCEloC(PyMCModel):
         with pm.Model() as model:
             mu = pm.Normal("mu", 0.0, sigma=0.5, shape=(len(self.mu_index_),))
             elo_logit_scale = pm.HalfNormal("elo_logit_scale", sigma=1.0)
-            win_lik = pm.Bernoulli(
-                "win_lik",
-                logit_p=self.data_.matchup__non_mirror.to_numpy(int)
-                * mu[self.data_.matchup__mup.cat.codes]
+            win_lik = self.win_lik_m(
+                logit_p=self.model_data_.matchup__non_mirror.to_numpy(int)
+                * mu[self.model_data_.matchup__mup.cat.codes]
                 + elo_logit_scale
                 * (
-                    logit(self.data_.pc_elo_estimate) - self.pc_elo_estimate_logit_mean_
+                    logit(self.model_data_.pc_elo_estimate)
+                    - self.pc_elo_estimate_logit_mean_
                 ),
-                observed=self.y_,
             )
             if self.sample_weight_ is not None:
                 pm.Potential(
@@ -44,16 +44,10 @@ class MUPCEloC(PyMCModel):
 
     def p1_win_chance(self, X: pandas.DataFrame) -> pandas.DataFrame:
         non_mirror = (X.character_1 != X.character_2).astype(int)
-        matchup_value = self.inf_data_["posterior"].mu.mean(["chain", "draw"])
-        matchup = X.aggregate(
-            lambda x: float(
-                matchup_value.sel(matchup=f"{x.character_1}-{x.character_2}")
-            ),
-            axis=1,
-        )
-        elo_logit_scale = float(
-            self.inf_data_["posterior"].elo_logit_scale.mean(["chain", "draw"])
+        matchup = self.posterior_mean_at(
+            "mu", matchup=matchup_categorical(X.character_1, X.character_2)
         )
+        elo_logit_scale = float(self.posterior_summary["elo_logit_scale"].mean)
         prob_p1_win = expit(
             (non_mirror * matchup)
             + (
@@ -62,6 +56,4 @@ class MUPCEloC(PyMCModel):
             )
         )
 
-        return pandas.DataFrame(
-            {1: prob_p1_win, 0: 1 - prob_p1_win}, columns=self.classes_
-        )
+        return self.win_chance_frame(X, prob_p1_win)
@@ -1,41 +1,153 @@
 import hashlib
 import inspect
 import logging
-from abc import abstractmethod
-from functools import cached_property
+from abc import ABC, abstractmethod
+from datetime import datetime
+from functools import cached_property, partial
+from typing import List
 
+import jax
+import jax.numpy as jnp
+import numpy
+import pandas
 import pymc as pm
 import pymc.math as pmmath
 import pymc.sampling_jax
+import xarray
 from scipy.special import expit, logit
 
-from ..model import YomiModel
+from .. import sampling
+from ..model import YomiModel, aggregate_wins
+from ..posterior_cache import (
+    DEFAULT_CACHE_DIR,
+    DEFAULT_CACHE_SIZE,
+    PosteriorCache,
+    fingerprint,
+)
+from ..posterior_summary import DEFAULT_QUANTILES, PosteriorSummary
+from ..sampling import (
+    fit_advi,
+    fit_laplace,
+    sample_warm_blackjax_nuts,
+    warm_start_state,
+)
 
 logger = logging.getLogger(__name__)
 
+INFERENCE_METHODS = ["nuts", "advi", "map+laplace"]
+
+
+def take_draws(values, positions):
+    """
+    ``values[:, positions]`` for an array of per-draw ``values``, with NaN
+    where a position is -1 (a label that isn't a coordinate).
+    """
+    return jnp.where(positions >= 0, values[:, jnp.maximum(positions, 0)], jnp.nan)
+
+
+def _quantile(values, q):
+    # Linearly interpolated quantile of each row (as numpy.quantile), found
+    # with top_k from just the smallest or largest values in the row. XLA's
+    # CPU sort is an order of magnitude slower (as is top_k on float64, which
+    # is why callers pass float32), and indexing into a top_k result directly
+    # makes XLA rewrite it as a sort, so the two values to interpolate between
+    # are picked out with a second, small top_k, and reductions over that
+    n = values.shape[-1]
+    position = q * (n - 1)
+    below = int(numpy.floor(position))
+    above = min(below + 1, n - 1)
+    if below == above:
+        return values.max(axis=-1)
+    if position <= (n - 1) / 2:
+        smallest = -jax.lax.top_k(-values, above + 1)[0]
+        nearest = jax.lax.top_k(smallest, 2)[0]
+    else:
+        largest = jax.lax.top_k(values, n - below)[0]
+        nearest = -jax.lax.top_k(-largest, 2)[0]
+    low, high = nearest.min(axis=-1), nearest.max(axis=-1)
+    return low + (position - below) * (high - low)
+
+
+@partial(jax.jit, static_argnames=("draw_logit", "n_draws", "interval_prob"))
+def _summarize_draws(params, inputs, draw_logit, n_draws, interval_prob):
+    # ``params`` holds (chunk, draw, ...) arrays, so that only one chunk of
+    # draws is expanded to per-game values at a time
+    probs = jax.lax.map(lambda chunk: jax.nn.sigmoid(draw_logit(chunk, inputs)), params)
+    probs = probs.reshape(-1, probs.shape[-1])[:n_draws].T
+    tail = (1 - interval_prob) / 2
+    return (
+        probs.mean(axis=-1),
+        _quantile(probs.astype(jnp.float32), tail),
+        _quantile(probs.astype(jnp.float32), 1 - tail),
+    )
+
 
 class PyMCModel(YomiModel):
     model_: pm.Model
+    model_data_: pandas.DataFrame
+
+    def __init__(
+        self,
+        min_games=0,
+        warmup=500,
+        samples=1000,
+        aggregate=False,
+        posterior_cache=DEFAULT_CACHE_DIR,
+        posterior_cache_size=DEFAULT_CACHE_SIZE,
+        warm_start_warmup=50,
+        inference="nuts",
+        chains=4,
+        chain_method="parallel",
+        split_samples=False,
+        summary_quantiles=DEFAULT_QUANTILES,
+    ):
+        super().__init__(min_games=min_games, warmup=warmup, samples=samples)
+        self.aggregate = aggregate
+        self.posterior_cache = posterior_cache
+        self.posterior_cache_size = posterior_cache_size
+        self.warm_start_warmup = warm_start_warmup
+        self.inference = inference
+        self.chains = chains
+        self.chain_method = chain_method
+        self.split_samples = split_samples
+        self.summary_quantiles = summary_quantiles
 
     @cached_property
     def model_hash(self):
         with open(inspect.getfile(self.__class__), "rb") as source:
             return hashlib.md5(source.read()).hexdigest()[:6]
 
+    @cached_property
+    def source_hash(self):
+        # Everything that defines the fitted posterior: this model's class and
+        # the classes it inherits priors and likelihoods from, and the
+        # samplers
+        paths = [
+            inspect.getfile(cls)
+            for cls in type(self).__mro__
+            if issubclass(cls, PyMCModel)
+        ]
+        paths.append(inspect.getfile(sampling))
+        digest = hashlib.md5()
+        for path in dict.fromkeys(paths):
+            with open(path, "rb") as source:
+                digest.update(source.read())
+        return digest.hexdigest()
+
     @cached_property
     def mu_m(self):
         return pm.Normal(
             "mu",
             0.0,
             sigma=0.5,
-            shape=(len(self.data_.matchup__mup.dtype.categories),),
+            shape=(len(self.model_data_.matchup__mup.dtype.categories),),
         )
 
     @cached_property
     def mu_logit_m(self):
         return (
-            self.data_.matchup__non_mirror.to_numpy(int)
-            * self.mu_m[self.data_.matchup__mup.cat.codes]
+            self.model_data_.matchup__non_mirror.to_numpy(int)
+            * self.mu_m[self.model_data_.matchup__mup.cat.codes]
         )
 
     @cached_property
@@ -44,7 +156,7 @@ class PyMCModel(YomiModel):
             "with_gem",
             0.0,
             sigma=0.5,
-            shape=(len(self.data_.gem__with_gem_1.dtype.categories),),
+            shape=(len(self.model_data_.gem__with_gem_1.dtype.categories),),
         )
 
     @cached_property
@@ -53,37 +165,37 @@ class PyMCModel(YomiModel):
             "against_gem",
             0.0,
             sigma=0.5,
-            shape=(len(self.data_.gem__against_gem_1.dtype.categories),),
+            shape=(len(self.model_data_.gem__against_gem_1.dtype.categories),),
         )
 
     @cached_property
     def gem_effect_logit_m(self):
         return (
-            self.with_gem_m[self.data_.gem__with_gem_1.cat.codes]
-            + self.against_gem_m[self.data_.gem__against_gem_1.cat.codes]
-            - self.with_gem_m[self.data_.gem__with_gem_2.cat.codes]
-            - self.against_gem_m[self.data_.gem__against_gem_2.cat.codes]
+            self.with_gem_m[self.model_data_.gem__with_gem_1.cat.codes]
+            + self.against_gem_m[self.model_data_.gem__against_gem_1.cat.codes]
+            - self.with_gem_m[self.model_data_.gem__with_gem_2.cat.codes]
+            - self.against_gem_m[self.model_data_.gem__against_gem_2.cat.codes]
         )
 
     @cached_property
     def global_pc_elo_estimate_logit_m(self):
         pc_elo_scale = pm.HalfNormal("pc_elo_scale", sigma=1.0)
-        return pc_elo_scale * logit(self.data_.pc_elo__prob)
+        return pc_elo_scale * logit(self.model_data_.pc_elo__prob)
 
     @cached_property
     def global_elo_estimate_logit_m(self):
         elo_scale = pm.HalfNormal("elo_scale", sigma=1.0)
-        return elo_scale * logit(self.data_.elo__prob)
+        return elo_scale * logit(self.model_data_.elo__prob)
 
     @cached_property
     def global_pc_glicko_estimate_logit_m(self):
         pc_glicko_scale = pm.HalfNormal("pc_glicko_scale", sigma=1.0)
-        return pc_glicko_scale * logit(self.data_.pc_glicko__prob)
+        return pc_glicko_scale * logit(self.model_data_.pc_glicko__prob)
 
     @cached_property
     def global_glicko_estimate_logit_m(self):
         glicko_scale = pm.HalfNormal("glicko_scale", sigma=1.0)
-        return glicko_scale * logit(self.data_.glicko__prob)
+        return glicko_scale * logit(self.model_data_.glicko__prob)
 
     @cached_property
     def pooled_pc_glicko_estimate_logit_m(self):
@@ -91,18 +203,18 @@ class PyMCModel(YomiModel):
             "player_pc_glicko_scale", sigma=1.0, dims=("player",)
         )
         return (
-            pc_glicko_scale[self.data_.min_games__player_1.cat.codes]
-            * pc_glicko_scale[self.data_.min_games__player_2.cat.codes]
-            * logit(self.data_.pc_glicko__prob)
+            pc_glicko_scale[self.model_data_.min_games__player_1.cat.codes]
+            * pc_glicko_scale[self.model_data_.min_games__player_2.cat.codes]
+            * logit(self.model_data_.pc_glicko__prob)
         )
 
     @cached_property
     def pooled_glicko_estimate_logit_m(self):
         glicko_scale = pm.HalfNormal("player_glicko_scale", sigma=1.0, dims=("player",))
         return (
-            glicko_scale[self.data_.min_games__player_1.cat.codes]
-            * glicko_scale[self.data_.min_games__player_2.cat.codes]
-            * logit(self.data_.glicko__prob)
+            glicko_scale[self.model_data_.min_games__player_1.cat.codes]
+            * glicko_scale[self.model_data_.min_games__player_2.cat.codes]
+            * logit(self.model_data_.glicko__prob)
         )
 
     def weighted_m(self, win_lik):
@@ -112,38 +224,257 @@ class PyMCModel(YomiModel):
                 pmmath.prod(pmmath.stack([self.sample_weight_, win_lik])),
             )
 
-    def fit(self, X, y=None, sample_weight=None) -> "PyMCModel":
+    def latest_cached_posterior(self):
+        # Only NUTS posteriors are worth warm-starting NUTS from
+        if not self.posterior_cache:
+            return None
+        return PosteriorCache(self.posterior_cache, self.posterior_cache_size).latest(
+            f"{self.model_name}-{self.model_hash}-nuts-"
+        )
+
+    def win_lik_m(self, logit_p):
+        if self.model_trials_ is None:
+            return pm.Bernoulli("win_lik", logit_p=logit_p, observed=self.model_y_)
+        return pm.Binomial(
+            "win_lik", n=self.model_trials_, logit_p=logit_p, observed=self.model_y_
+        )
+
+    def fit(self, X, y=None, sample_weight=None, warm_start=None) -> "PyMCModel":
         super().fit(X, y, sample_weight)
-        with self.model_:
-            self.inf_data_ = pymc.sampling_jax.sample_blackjax_nuts(
-                tune=self.warmup,
-                draws=self.samples,
-                chains=4,
-                # postprocessing_chunks=1000,
-                # var_names=["mu", "char_skill", "elo_logit_scale"],=True,
-                idata_kwargs=dict(
-                    # log_likelihood=True,
-                    coords={
-                        "matchup": X.matchup__mup.dtype.categories.values,
-                        "with_gem_c": (
-                            X.gem__with_gem_1.dtype.categories.values
-                            if "gem__with_gem_1" in X.columns
-                            else []
-                        ),
-                        "against_gem_c": (
-                            X.gem__against_gem_1.dtype.categories.values
-                            if "gem__against_gem_1" in X.columns
-                            else []
-                        ),
-                        "player": X.min_games__player_1.dtype.categories.values,
-                    },
-                    dims={
-                        "mu": ["matchup"],
-                        "with_gem": ["with_gem_c"],
-                        "against_gem": ["against_gem_c"],
-                        "player_pc_glicko_scale": ["player"],
-                        "player_glicko_scale": ["player"],
-                    },
-                ),
+        if self.aggregate:
+            if sample_weight is not None:
+                raise ValueError("Weighted games can't be aggregated")
+            self.model_data_, self.model_y_, self.model_trials_ = aggregate_wins(
+                X, self.y_
+            )
+            logger.info(f"Aggregated {len(X)} games into {len(self.model_data_)} rows")
+        else:
+            self.model_data_, self.model_y_, self.model_trials_ = X, self.y_, None
+
+        chains = self.chains
+        chain_method = self.chain_method
+        if chain_method == "parallel" and chains > jax.local_device_count():
+            logger.warning(
+                f"Only {jax.local_device_count()} devices for {chains} chains, "
+                "vectorizing chains instead"
             )
+            chain_method = "vectorized"
+        # With split_samples, samples is a total budget shared by all chains,
+        # so adding chains makes each one shorter rather than adding draws
+        draws = -(-self.samples // chains) if self.split_samples else self.samples
+        cache = (
+            PosteriorCache(self.posterior_cache, self.posterior_cache_size)
+            if self.posterior_cache
+            else None
+        )
+        warm_state = (
+            warm_start_state(self.model_, warm_start, chains)
+            if warm_start is not None and self.inference == "nuts"
+            else None
+        )
+        # A warm-started posterior is only tuned for warm_start_warmup steps
+        # from its starting state, so it mustn't be served for a cold fit (or
+        # one warm-started from a different posterior)
+        if warm_state is None:
+            warm_key = []
+        else:
+            position, step_size, inverse_mass_matrix = warm_state
+            warm_key = [
+                "warm",
+                self.warm_start_warmup,
+                step_size,
+                inverse_mass_matrix,
+                *position,
+            ]
+        cache_key = (
+            f"{self.model_name}-{self.model_hash}-{self.inference}-"
+            + fingerprint(
+                X,
+                self.classes_,
+                self.y_,
+                sample_weight,
+                self.aggregate,
+                self.warmup,
+                draws,
+                chains,
+                self.inference,
+                chain_method,
+                self.source_hash,
+                *warm_key,
+            )
+        )
+        if cache is not None:
+            self.inf_data_ = cache.get(cache_key)
+            if self.inf_data_ is not None:
+                return self
+
+        idata_kwargs = dict(
+            # log_likelihood=True,
+            coords={
+                "matchup": X.matchup__mup.dtype.categories.values,
+                "with_gem_c": (
+                    X.gem__with_gem_1.dtype.categories.values
+                    if "gem__with_gem_1" in X.columns
+                    else []
+                ),
+                "against_gem_c": (
+                    X.gem__against_gem_1.dtype.categories.values
+                    if "gem__against_gem_1" in X.columns
+                    else []
+                ),
+                "player": X.min_games__player_1.dtype.categories.values,
+            },
+            dims={
+                "mu": ["matchup"],
+                "with_gem": ["with_gem_c"],
+                "against_gem": ["against_gem_c"],
+                "player_pc_glicko_scale": ["player"],
+                "player_glicko_scale": ["player"],
+            },
+        )
+        with self.model_:
+            if self.inference == "advi":
+                self.inf_data_ = fit_advi(
+                    self.model_, draws=self.samples, idata_kwargs=idata_kwargs
+                )
+            elif self.inference == "map+laplace":
+                self.inf_data_ = fit_laplace(
+                    self.model_, draws=self.samples, idata_kwargs=idata_kwargs
+                )
+            elif self.inference not in INFERENCE_METHODS:
+                raise ValueError(f"Unknown inference method {self.inference!r}")
+            elif warm_state is not None:
+                self.inf_data_ = sample_warm_blackjax_nuts(
+                    self.model_,
+                    position,
+                    step_size,
+                    inverse_mass_matrix,
+                    tune=self.warm_start_warmup,
+                    draws=draws,
+                    chain_method=chain_method,
+                    idata_kwargs=idata_kwargs,
+                )
+            else:
+                self.inf_data_ = pymc.sampling_jax.sample_blackjax_nuts(
+                    tune=self.warmup,
+                    draws=draws,
+                    chains=chains,
+                    chain_method=chain_method,
+                    # postprocessing_chunks=1000,
+                    # var_names=["mu", "char_skill", "elo_logit_scale"],=True,
+                    # Keep the unconstrained values, so that later fits can be
+                    # warm-started from this one
+                    keep_untransformed=True,
+                    idata_kwargs=idata_kwargs,
+                )
+        # Record how the posterior was fit, so that later fits only warm start
+        # from NUTS posteriors
+        posterior = self.inf_data_["posterior"]
+        posterior.attrs["inference"] = self.inference
+        posterior.attrs["chains"] = posterior.sizes["chain"]
+        if cache is not None:
+            cache.put(cache_key, self.inf_data_)
         return self
+
+    @cached_property
+    def posterior_summary(self) -> PosteriorSummary:
+        return PosteriorSummary(self.inf_data_["posterior"], self.summary_quantiles)
+
+    def posterior_mean(self, name) -> xarray.DataArray:
+        return self.posterior_summary.to_xarray(name)
+
+    def posterior_mean_at(self, name, **labels) -> numpy.ndarray:
+        return self.posterior_summary.lookup(name, **labels)
+
+
+class DrawPredictions(ABC):
+    """
+    Mixin for PyMCModels whose win probability can be written as a JAX
+    expression of their posterior draws, adding ``predict_proba_draws``.
+    """
+
+    # Posterior variables used by draw_logit
+    draw_variables: List[str] = []
+
+    @abstractmethod
+    def draw_inputs(self, X: pandas.DataFrame) -> dict:
+        """
+        Per-game numpy arrays that ``draw_logit`` needs from ``X`` (e.g.
+        coordinate positions from ``label_positions``).
+        """
+
+    @staticmethod
+    @abstractmethod
+    def draw_logit(params: dict, inputs: dict):
+        """
+        JAX expression for the logit of player 1 winning, as a (draw, game)
+        array, given (draw, ...) arrays of ``draw_variables`` and the
+        ``draw_inputs`` for a chunk of games.
+        """
+
+    def predict_proba_draws(
+        self, X, interval_prob=0.94, games_chunk=1024, draws_chunk=250
+    ) -> pandas.DataFrame:
+        """
+        Player 1's win probability for each game in ``X`` under every
+        posterior draw, summarized as its mean and central ``interval_prob``
+        credible interval.
+
+        Chunks of ``games_chunk`` games are spread across the XLA host
+        devices, and evaluated ``draws_chunk`` draws at a time, so memory use
+        is bounded by ``games_chunk`` times the number of draws per device.
+        """
+        devices = jax.devices("cpu")
+        posterior = self.inf_data_["posterior"]
+        n_draws = posterior.sizes["chain"] * posterior.sizes["draw"]
+        n_chunks = -(-n_draws // draws_chunk)
+        params = {}
+        for name in self.draw_variables:
+            values = posterior[name].to_numpy()
+            values = values.reshape(n_draws, *values.shape[2:])
+            # Pad with copies of the last draw, which are dropped before
+            # summarizing
+            values = numpy.concatenate(
+                [values, numpy.repeat(values[-1:], n_chunks * draws_chunk - n_draws, 0)]
+            )
+            params[name] = values.reshape(n_chunks, draws_chunk, *values.shape[1:])
+
+        inputs = self.draw_inputs(X)
+        n_games = len(X)
+        per_step = len(devices) * games_chunk
+        n_steps = max(-(-n_games // per_step), 1)
+        # Pad with copies of the first game, and split into (step, device, game)
+        padding = numpy.zeros(n_steps * per_step - n_games, dtype=int)
+        inputs = {
+            name: numpy.concatenate([values, values[padding]]).reshape(
+                n_steps, len(devices), games_chunk
+            )
+            for name, values in inputs.items()
+        }
+
+        summarize = jax.pmap(
+            partial(
+                _summarize_draws,
+                draw_logit=self.draw_logit,
+                n_draws=n_draws,
+                interval_prob=interval_prob,
+            ),
+            in_axes=(None, 0),
+            devices=devices,
+        )
+        start = datetime.now()
+        summaries = [
+            numpy.stack(
+                summarize(
+                    params, {name: values[step] for name, values in inputs.items()}
+                )
+            ).reshape(3, -1)
+            for step in range(n_steps)
+        ]
+        logger.info(
+            f"Evaluated {n_draws} draws for {n_games} games in {datetime.now() - start}"
+        )
+        mean, lower, upper = numpy.concatenate(summaries, axis=1)[:, :n_games]
+        return pandas.DataFrame(
+            {"mean": mean, "lower": lower, "upper": upper}, index=X.index
+        )
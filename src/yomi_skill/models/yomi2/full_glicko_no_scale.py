@@ -3,28 +3,34 @@ from functools import cached_property
 import pandas
 import pymc as pm
 from scipy.special import expit, logit
-from skelo.model.glicko2 import Glicko2Estimator
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import FunctionTransformer
+from sklearn.utils.parallel import Parallel, delayed
 
+from ...glicko import Glicko2Estimator
 from ...model import (
     matchup_transformer,
     min_games_transformer,
     render_transformer,
     gem_effect_transformer,
     _dynamic_period_grouper,
+    label_positions,
 )
-from ..pymc_model import PyMCModel
+from ..pymc_model import DrawPredictions, PyMCModel, take_draws
 
 
-class Y2FullGlickoNoScale(PyMCModel):
+class Y2FullGlickoNoScale(PyMCModel, DrawPredictions):
     model_name = "y2_full_glicko_no_scale"
     weight_key = "pc_glicko"
+    draw_variables = ["mu", "with_gem", "against_gem", "player_global_scale"]
 
     @classmethod
-    def pipeline(cls, memory=None, verbose=False, prefit_games=None, **params):
-
+    def prefit_ratings(cls, prefit_games, n_jobs=None, **params):
+        """
+        Glicko ratings from ``prefit_games`` (the Yomi 1 history) to start the
+        Yomi 2 ratings from, keyed by transformer name.
+        """
         prefit_games["player__period_idx"] = _dynamic_period_grouper(
             prefit_games, **params["rating_periods__player__kw_args"]
         ).period_idx
@@ -44,11 +50,6 @@ class Y2FullGlickoNoScale(PyMCModel):
                 if name.startswith("transform__glicko__")
             },
         )
-        glicko.fit(
-            prefit_games,
-            prefit_games.win,
-        )
-
         pc_glicko = Glicko2Estimator(
             key1_field="player_character_1",
             key2_field="player_character_2",
@@ -60,10 +61,25 @@ class Y2FullGlickoNoScale(PyMCModel):
                 if name.startswith("transform__pc_glicko__")
             },
         )
-        pc_glicko.fit(
-            prefit_games,
-            prefit_games.win,
+        # The two rating systems are independent, so fit them side by side
+        glicko, pc_glicko = Parallel(n_jobs=n_jobs)(
+            delayed(estimator.fit)(prefit_games, prefit_games.win)
+            for estimator in [glicko, pc_glicko]
         )
+        return {"glicko": glicko.ratings_, "pc_glicko": pc_glicko.ratings_}
+
+    @classmethod
+    def pipeline(
+        cls,
+        memory=None,
+        verbose=False,
+        n_jobs=None,
+        prefit_games=None,
+        prefit_ratings=None,
+        **params,
+    ):
+        if prefit_ratings is None:
+            prefit_ratings = cls.prefit_ratings(prefit_games, n_jobs=n_jobs, **params)
 
         return Pipeline(
             [
@@ -103,6 +119,7 @@ class Y2FullGlickoNoScale(PyMCModel):
                                 ],
                             ),
                         ],
+                        n_jobs=n_jobs,
                     ),
                 ),
                 (
@@ -121,7 +138,7 @@ class Y2FullGlickoNoScale(PyMCModel):
                                     key1_field="player_1",
                                     key2_field="player_2",
                                     timestamp_field="match_date",
-                                    initial_ratings=glicko.rating_model.ratings,
+                                    initial_ratings=prefit_ratings["glicko"],
                                     rating_period_field="player__period_idx",
                                 ),
                                 [
@@ -137,7 +154,7 @@ class Y2FullGlickoNoScale(PyMCModel):
                                     key1_field="player_character_1",
                                     key2_field="player_character_2",
                                     timestamp_field="match_date",
-                                    initial_ratings=pc_glicko.rating_model.ratings,
+                                    initial_ratings=prefit_ratings["pc_glicko"],
                                     rating_period_field="player_character__period_idx",
                                 ),
                                 [
@@ -169,6 +186,7 @@ class Y2FullGlickoNoScale(PyMCModel):
                             ),
                         ],
                         remainder="drop",
+                        n_jobs=n_jobs,
                     ),
                 ),
                 ("model", cls()),
@@ -181,38 +199,37 @@ class Y2FullGlickoNoScale(PyMCModel):
     def model_(self):
         with pm.Model(
             coords={
-                "matchup": self.data_.matchup__mup.dtype.categories.values,
-                "with_gem": self.data_.gem__with_gem_1.dtype.categories.values,
-                "against_gem": self.data_.gem__against_gem_1.dtype.categories.values,
-                "player": self.data_.min_games__player_1.dtype.categories.values,
+                "matchup": self.model_data_.matchup__mup.dtype.categories.values,
+                "with_gem": self.model_data_.gem__with_gem_1.dtype.categories.values,
+                "against_gem": self.model_data_.gem__against_gem_1.dtype.categories.values,
+                "player": self.model_data_.min_games__player_1.dtype.categories.values,
             }
         ) as model:
             player_global_scale = pm.Uniform("player_global_scale", upper=1, lower=0)
-            win_lik = pm.Bernoulli(
-                "win_lik",
+            win_lik = self.win_lik_m(
                 logit_p=self.mu_logit_m
                 + self.gem_effect_logit_m
-                + (player_global_scale * logit(self.data_.pc_glicko__prob))
-                + ((1 - player_global_scale) * logit(self.data_.glicko__prob)),
-                observed=self.y_,
+                + (player_global_scale * logit(self.model_data_.pc_glicko__prob))
+                + ((1 - player_global_scale) * logit(self.model_data_.glicko__prob)),
             )
             self.weighted_m(win_lik)
         return model
 
     def p1_win_chance(self, X: pandas.DataFrame) -> pandas.DataFrame:
-        posterior = self.inf_data_["posterior"].mean(["chain", "draw"])
+        summary = self.posterior_summary
 
-        matchup = posterior.mu.sel(matchup=X.matchup__mup.to_numpy())
+        matchup = summary.lookup("mu", matchup=X.matchup__mup)
 
-        with_gem_1 = posterior.with_gem.sel(with_gem_c=X.gem__with_gem_1.to_numpy())
-        with_gem_2 = posterior.with_gem.sel(with_gem_c=X.gem__with_gem_2.to_numpy())
-        against_gem_1 = posterior.against_gem.sel(
-            against_gem_c=X.gem__against_gem_1.to_numpy()
+        with_gem_1 = summary.lookup("with_gem", with_gem_c=X.gem__with_gem_1)
+        with_gem_2 = summary.lookup("with_gem", with_gem_c=X.gem__with_gem_2)
+        against_gem_1 = summary.lookup(
+            "against_gem", against_gem_c=X.gem__against_gem_1
         )
-        against_gem_2 = posterior.against_gem.sel(
-            against_gem_c=X.gem__against_gem_2.to_numpy()
+        against_gem_2 = summary.lookup(
+            "against_gem", against_gem_c=X.gem__against_gem_2
         )
 
+        player_global_scale = float(summary["player_global_scale"].mean)
         global_pc_glicko_estimate_logit = logit(X.pc_glicko__prob)
         global_glicko_estimate_logit = logit(X.glicko__prob)
 
@@ -224,10 +241,42 @@ class Y2FullGlickoNoScale(PyMCModel):
             + against_gem_1
             - with_gem_2
             - against_gem_2
-            + global_pc_glicko_estimate_logit * float(posterior.player_global_scale)
-            + global_glicko_estimate_logit * (1 - float(posterior.player_global_scale))
+            + global_pc_glicko_estimate_logit * player_global_scale
+            + global_glicko_estimate_logit * (1 - player_global_scale)
         )
 
-        return pandas.DataFrame(
-            {1: prob_p1_win, 0: 1 - prob_p1_win}, columns=self.classes_
+        return self.win_chance_frame(X, prob_p1_win)
+
+    def draw_inputs(self, X: pandas.DataFrame) -> dict:
+        posterior = self.inf_data_["posterior"]
+        return {
+            "matchup": label_positions(posterior.mu, matchup=X.matchup__mup)[0],
+            "with_gem_1": label_positions(
+                posterior.with_gem, with_gem_c=X.gem__with_gem_1
+            )[0],
+            "with_gem_2": label_positions(
+                posterior.with_gem, with_gem_c=X.gem__with_gem_2
+            )[0],
+            "against_gem_1": label_positions(
+                posterior.against_gem, against_gem_c=X.gem__against_gem_1
+            )[0],
+            "against_gem_2": label_positions(
+                posterior.against_gem, against_gem_c=X.gem__against_gem_2
+            )[0],
+            "non_mirror": X.matchup__non_mirror.to_numpy(float),
+            "pc_glicko_logit": logit(X.pc_glicko__prob.to_numpy(float)),
+            "glicko_logit": logit(X.glicko__prob.to_numpy(float)),
+        }
+
+    @staticmethod
+    def draw_logit(params: dict, inputs: dict):
+        player_global_scale = params["player_global_scale"][:, None]
+        return (
+            inputs["non_mirror"] * take_draws(params["mu"], inputs["matchup"])
+            + take_draws(params["with_gem"], inputs["with_gem_1"])
+            + take_draws(params["against_gem"], inputs["against_gem_1"])
+            - take_draws(params["with_gem"], inputs["with_gem_2"])
+            - take_draws(params["against_gem"], inputs["against_gem_2"])
+            + inputs["pc_glicko_logit"] * player_global_scale
+            + inputs["glicko_logit"] * (1 - player_global_scale)
         )
@@ -1,11 +1,322 @@
 from decimal import Decimal
+from collections import defaultdict
+from itertools import combinations
 import gambit
 import pandas as pd
 import numpy as np
+from scipy import sparse
+from scipy.optimize import linprog
+from scipy.special import expit
+from sklearn.utils.parallel import Parallel, delayed
+
+
+def counterpick_payoffs(mu, wins_required):
+    """
+    Player 1's chance of winning a set played under standard counterpick rules
+    (the loser of each game may switch characters), for every number of wins
+    each player still needs, as a ``(p1_req, p2_req, c1, c2)`` array, given
+    ``mu``, player 1's chance of winning each single game, by character.
+
+    ``mu`` may have leading batch dimensions, which come after the win
+    requirements in the result.
+    """
+    mu = np.asarray(mu, dtype=float)
+    payoffs = np.empty((wins_required + 1, wins_required + 1, *mu.shape))
+    payoffs[0, :] = 1
+    payoffs[1:, 0] = 0
+    # Each state depends on the states with one fewer win required by
+    # either player, which have already been filled in
+    for p1_req in range(1, wins_required + 1):
+        for p2_req in range(1, wins_required + 1):
+            # After losing a game, player 2 switches to their best counterpick
+            # against player 1's character (and vice versa)
+            p2_counterpick = payoffs[p1_req - 1, p2_req].min(axis=-1)[..., :, None]
+            p1_counterpick = payoffs[p1_req, p2_req - 1].max(axis=-2)[..., None, :]
+            payoffs[p1_req, p2_req] = mu * p2_counterpick + (1 - mu) * p1_counterpick
+    return payoffs
+
+
+def counterpick_games_played(mu, payoffs, characters=None):
+    """
+    The expected number of games played in each matchup over a whole set,
+    as a ``(c1, c2, m1, m2)`` array of the games in matchup ``(m1, m2)`` when
+    the set starts in matchup ``(c1, c2)``, given the ``counterpick_payoffs``
+    for ``mu``. Where several counterpicks are equally good, player 2 takes
+    the first and player 1 the last by name in ``characters`` (or by
+    position, if no names are given).
+    """
+    mu = np.asarray(mu, dtype=float)
+    n_characters = mu.shape[-1]
+    ranks = _name_ranks(characters, n_characters)
+    wins_required = payoffs.shape[0] - 1
+    characters = np.arange(n_characters)
+    played_one = np.eye(n_characters * n_characters).reshape((n_characters,) * 4)
+    no_games = np.zeros((n_characters,) * 4)
+    p1_win_chance = mu[:, :, None, None]
+    # Only the rows for the current and previous p1_req are kept, since each
+    # state depends only on those
+    previous = [no_games] * (wins_required + 1)
+    for p1_req in range(1, wins_required + 1):
+        current = [no_games]
+        for p2_req in range(1, wins_required + 1):
+            p2_counterpick = _first_near_min(payoffs[p1_req - 1, p2_req], ranks)
+            p1_counterpick = _last_near_max(payoffs[p1_req, p2_req - 1].T, ranks)
+            after_p1_win = previous[p2_req][characters, p2_counterpick]
+            after_p2_win = current[p2_req - 1][p1_counterpick, characters]
+            current.append(
+                played_one
+                + p1_win_chance * after_p1_win[:, None]
+                + (1 - p1_win_chance) * after_p2_win[None, :]
+            )
+        previous = current
+    return previous[wins_required]
+
+
+def constant_sum_payoffs(characters, payoffs):
+    """
+    Player 1's payoff in the blind-pick game built from the ``(c1, c2)`` set
+    ``payoffs`` of a single win requirement: the payoffs for c1 <= c2 (by
+    name), and 1 less the payoffs of the reversed matchup otherwise, so that
+    the game is constant-sum.
+
+    ``characters`` may have the same leading batch dimensions as ``payoffs``.
+    """
+    names = np.asarray(characters)
+    below = names[..., :, None] > names[..., None, :]
+    mirror = names[..., :, None] == names[..., None, :]
+    rates = np.where(below, 1 - np.swapaxes(payoffs, -1, -2), payoffs)
+    return np.where(mirror, 0.5, rates)
+
+
+def blind_pick_equilibrium(rates):
+    """
+    Player 1's equilibrium pick probabilities in the constant-sum blind-pick
+    game with payoffs ``rates`` (rounded to 4 places).
+    """
+    rates = np.array([[Decimal(f"{val:.4f}") for val in row] for row in rates])
+    g = gambit.Game.from_arrays(rates, rates.transpose())
+    eqs = gambit.nash.lp_solve(g)
+    return np.array(eqs[0][g.players[0]]).astype(float)
+
+
+def linprog_equilibria(rates, games_chunk=64):
+    """
+    Player 1's maximin pick probabilities for each of a ``(..., c1, c2)``
+    stack of zero-sum (or constant-sum) games with payoffs ``rates``.
+
+    Each chunk of ``games_chunk`` games is solved as a single block-diagonal
+    LP with scipy's HiGHS: maximize the sum of the games' values ``v``,
+    subject to every column of each game paying at least its ``v``.
+    """
+    rates = np.asarray(rates, dtype=float)
+    n_rows, n_cols = rates.shape[-2:]
+    games = rates.reshape(-1, n_rows, n_cols)
+    # Shifting each game to non-negative payoffs doesn't change its
+    # equilibrium, and keeps the values within linprog's default bounds
+    games = games - games.min(axis=(1, 2), keepdims=True)
+    picks = np.empty((len(games), n_rows))
+    for start in range(0, len(games), games_chunk):
+        chunk = games[start : start + games_chunk]
+        n_games = len(chunk)
+        n_vars = n_rows + 1
+        # -rates[:, col]·x + v <= 0, for every column of every game
+        upper = sparse.block_diag(
+            list(
+                np.concatenate(
+                    [-chunk.transpose(0, 2, 1), np.ones((n_games, n_cols, 1))],
+                    axis=2,
+                )
+            )
+        )
+        # The pick probabilities of each game sum to 1
+        total = sparse.kron(sparse.eye(n_games), np.append(np.ones(n_rows), 0)[None, :])
+        result = linprog(
+            np.tile(np.append(np.zeros(n_rows), -1), n_games),
+            A_ub=upper.tocsr(),
+            b_ub=np.zeros(n_games * n_cols),
+            A_eq=total.tocsr(),
+            b_eq=np.ones(n_games),
+            method="highs",
+        )
+        if result.status != 0:
+            raise RuntimeError(f"linprog failed: {result.message}")
+        chunk_picks = result.x.reshape(n_games, n_vars)[:, :n_rows].clip(0)
+        picks[start : start + n_games] = chunk_picks / chunk_picks.sum(
+            axis=1, keepdims=True
+        )
+    return picks.reshape(*rates.shape[:-2], n_rows)
+
+
+SOLVERS = ["gambit", "linprog"]
+
+
+def blind_pick_equilibria(rates, solver="gambit"):
+    """
+    Player 1's equilibrium pick probabilities for each of a ``(..., c1, c2)``
+    stack of blind-pick games, using ``solver`` (one of ``SOLVERS``).
+
+    gambit solves exactly on payoffs rounded to 4 places, and linprog on the
+    float payoffs, so where a game has several equilibria they may each
+    find a different one.
+    """
+    rates = np.asarray(rates, dtype=float)
+    if solver == "linprog":
+        return linprog_equilibria(rates)
+    if solver == "gambit":
+        games = rates.reshape(-1, *rates.shape[-2:])
+        return np.stack([blind_pick_equilibrium(game) for game in games]).reshape(
+            rates.shape[:-1]
+        )
+    raise ValueError(f"Unknown solver {solver!r}")
+
+
+def posterior_charts(model, draws=None, seed=None):
+    """
+    The characters, and a ``(draw, c1, c2)`` array of player 1's chance of
+    winning a game in each matchup, from the posterior draws of ``mu`` in the
+    fitted ``model``. With ``draws``, only that many draws (chosen at random)
+    are used.
+    """
+    mu = model.inf_data_["posterior"]["mu"].transpose("chain", "draw", "matchup")
+    matchups = [matchup.split("-") for matchup in mu.matchup.values]
+    values = mu.to_numpy().reshape(-1, len(matchups))
+    if draws is not None and draws < len(values):
+        rng = np.random.default_rng(seed)
+        values = values[np.sort(rng.choice(len(values), draws, replace=False))]
+    # Matchups are coded with character_1 <= character_2, in category order,
+    # so the mirrors list the characters in order
+    characters = [c1 for c1, c2 in matchups if c1 == c2]
+    positions = {character: idx for idx, character in enumerate(characters)}
+    c1 = np.array([positions[c1] for c1, _ in matchups])
+    c2 = np.array([positions[c2] for _, c2 in matchups])
+    charts = np.full((len(values), len(characters), len(characters)), 0.5)
+    non_mirror = c1 != c2
+    charts[:, c1[non_mirror], c2[non_mirror]] = expit(values[:, non_mirror])
+    charts[:, c2[non_mirror], c1[non_mirror]] = expit(-values[:, non_mirror])
+    return characters, charts
+
+
+def _solve_charts(characters, charts, best_of, solver="gambit"):
+    wins_required = (best_of + 1) // 2
+    win_rates = counterpick_payoffs(charts, wins_required)[wins_required, wins_required]
+    rates = constant_sum_payoffs(characters, win_rates)
+    return win_rates, blind_pick_equilibria(rates, solver)
+
+
+def cast_subsets(characters, size, include=(), exclude=()):
+    """
+    Every cast of ``size`` of ``characters`` (in their order) that contains
+    all of ``include`` and none of ``exclude``.
+    """
+    include, exclude = set(include), set(exclude)
+    pool = [c for c in characters if c not in include and c not in exclude]
+    for rest in combinations(pool, size - len(include)):
+        rest = set(rest)
+        yield tuple(c for c in characters if c in include or c in rest)
+
+
+def _summarize(values, interval_prob):
+    tail = (1 - interval_prob) / 2
+    return {
+        "mean": values.mean(axis=0),
+        "lower": np.quantile(values, tail, axis=0),
+        "upper": np.quantile(values, 1 - tail, axis=0),
+    }
+
+
+class PosteriorNash:
+    """
+    Blind-pick equilibria and counterpick win rates solved separately for
+    each posterior draw of the matchup chart, so that their spread shows how
+    well the data pins them down.
+    """
+
+    def __init__(self, characters, win_rates, pick_probabilities, best_of=7):
+        self.characters = characters
+        # Indexed by (draw, c1, c2)
+        self.win_rates = win_rates
+        # Indexed by (draw, character)
+        self.pick_probabilities = pick_probabilities
+        self.best_of = best_of
+
+    @classmethod
+    def from_model(
+        cls,
+        model,
+        best_of=7,
+        draws=None,
+        seed=None,
+        n_jobs=None,
+        draws_chunk=100,
+        solver="gambit",
+    ):
+        characters, charts = posterior_charts(model, draws=draws, seed=seed)
+        n_chunks = max(-(-len(charts) // draws_chunk), 1)
+        solved = Parallel(n_jobs=n_jobs)(
+            delayed(_solve_charts)(characters, chunk, best_of, solver)
+            for chunk in np.array_split(charts, n_chunks)
+        )
+        return cls(
+            characters,
+            np.concatenate([win_rates for win_rates, _ in solved]),
+            np.concatenate([picks for _, picks in solved]),
+            best_of=best_of,
+        )
+
+    def pick_summary(self, interval_prob=0.94):
+        """
+        Mean and central ``interval_prob`` credible interval of each
+        character's equilibrium pick probability, and the fraction of draws
+        in which it's picked at all.
+        """
+        return pd.DataFrame(
+            {
+                **_summarize(self.pick_probabilities, interval_prob),
+                "picked": (self.pick_probabilities > 1e-9).mean(axis=0),
+            },
+            index=pd.Index(self.characters, name="character"),
+        ).sort_values("mean", ascending=False)
+
+    def win_rate_summary(self, interval_prob=0.94):
+        """
+        Mean and central ``interval_prob`` credible interval of player 1's
+        chance of winning a counterpick set, by starting matchup.
+        """
+        n_characters = len(self.characters)
+        return pd.DataFrame(
+            _summarize(
+                self.win_rates.reshape(-1, n_characters * n_characters), interval_prob
+            ),
+            index=pd.MultiIndex.from_product(
+                [self.characters, self.characters], names=["c1", "c2"]
+            ),
+        )
+
+
+def _name_ranks(characters, n_characters):
+    # The rank of each position's name in sorted order
+    if characters is None:
+        return np.arange(n_characters)
+    return np.argsort(np.argsort(np.asarray(characters), kind="stable"))
+
+
+def _first_near_min(values, ranks, tolerance=1e-12):
+    # The position along the last axis within tolerance of the minimum with
+    # the lowest rank, matching a min over (payoff, character) pairs, so that
+    # exact ties (up to float rounding) go to the first character by name
+    near_min = values <= values.min(axis=-1, keepdims=True) + tolerance
+    return np.argmin(np.where(near_min, ranks, len(ranks)), axis=-1)
+
+
+def _last_near_max(values, ranks, tolerance=1e-12):
+    # The position along the last axis within tolerance of the maximum with
+    # the highest rank, matching a max over (payoff, character) pairs
+    near_max = values >= values.max(axis=-1, keepdims=True) - tolerance
+    return np.argmax(np.where(near_max, ranks, -1), axis=-1)
 
 
 class Nash:
-    def __init__(self, mu_chart, cast=None):
+    def __init__(self, mu_chart, cast=None, solver="gambit"):
         self._mu_chart = mu_chart.apply(Decimal)
         if cast:
             self.mu_chart = self._mu_chart.loc[(list(cast), list(cast))]
@@ -13,8 +324,15 @@ class Nash:
         else:
             self.mu_chart = self._mu_chart
             self.characters = self.mu_chart.index.levels[0].values
-        self._std_cp_payoffs = {}
-        self._std_cp_games_played = {}
+        self.mu_matrix = (
+            self.mu_chart.astype(float)
+            .unstack()
+            .reindex(index=self.characters, columns=self.characters)
+            .to_numpy()
+        )
+        self.solver = solver
+        self._cp_payoffs = {}
+        self._cp_games_played = {}
         self._blind_pick_nash = {}
 
     @classmethod
@@ -28,48 +346,130 @@ class Nash:
         return cls(win_rates)
 
     def cast_limited_to(self, cast):
-        return Nash(self.mu_chart, cast=cast)
+        return Nash(self.mu_chart, cast=cast, solver=self.solver)
 
-    def win_rate(self, best_of=7):
+    def cp_payoffs(self, best_of=7):
+        """
+        ``counterpick_payoffs`` for this chart, for a best-of-``best_of`` set.
+        """
         wins_required = (best_of + 1) // 2
-        return (
-            self.mu_chart.to_frame()
-            .apply(
-                lambda r: self.std_cp_payoff(
-                    r.name[0], wins_required, r.name[1], wins_required
-                ),
-                axis=1,
+        if wins_required not in self._cp_payoffs:
+            self._cp_payoffs[wins_required] = counterpick_payoffs(
+                self.mu_matrix, wins_required
             )
-            .rename("bo{}".format(best_of))
+        return self._cp_payoffs[wins_required]
+
+    def cp_games_played(self, best_of=7):
+        """
+        ``counterpick_games_played`` for this chart, for a best-of-``best_of``
+        set.
+        """
+        wins_required = (best_of + 1) // 2
+        if wins_required not in self._cp_games_played:
+            self._cp_games_played[wins_required] = counterpick_games_played(
+                self.mu_matrix, self.cp_payoffs(best_of), self.characters
+            )
+        return self._cp_games_played[wins_required]
+
+    def _chart_positions(self):
+        # Positions in self.characters of the matchups in mu_chart
+        characters = pd.Index(self.characters)
+        return (
+            characters.get_indexer(self.mu_chart.index.get_level_values(0)),
+            characters.get_indexer(self.mu_chart.index.get_level_values(1)),
+        )
+
+    def win_rate(self, best_of=7):
+        wins_required = (best_of + 1) // 2
+        c1, c2 = self._chart_positions()
+        return pd.Series(
+            self.cp_payoffs(best_of)[wins_required, wins_required, c1, c2],
+            index=self.mu_chart.index,
+            name="bo{}".format(best_of),
         )
 
     def blind_pick_nash_eq(self, best_of=7):
         if best_of not in self._blind_pick_nash:
-
-            rates = self.win_rate(best_of=best_of).to_frame()
-
-            def const_sum(row):
-                (c1, c2) = row.name
-                if c1 > c2:
-                    return Decimal(1) - rates.loc[c2, c1][0]
-                elif c1 == c2:
-                    return Decimal(0.5)
-                else:
-                    return rates.loc[c1, c2][0]
-
-            rates["const_sum"] = rates.apply(const_sum, axis=1)
-            # rates = rates.set_index(['c1', 'c2'])
-            rates = rates.const_sum.unstack()
-            rates = rates.to_numpy()
-
-            rates = np.array([[round(val, 4) for val in row] for row in rates])
-            g = gambit.Game.from_arrays(rates, rates.transpose())
-            eqs = gambit.nash.lp_solve(g)
+            wins_required = (best_of + 1) // 2
+            rates = constant_sum_payoffs(
+                self.characters,
+                self.cp_payoffs(best_of)[wins_required, wins_required],
+            )
             self._blind_pick_nash[best_of] = list(
-                zip(self.characters, np.array(eqs[0][g.players[0]]).astype(float))
+                zip(self.characters, blind_pick_equilibria(rates, self.solver))
             )
         return self._blind_pick_nash[best_of]
 
+    def cast_balance(
+        self,
+        casts=None,
+        size=None,
+        include=(),
+        exclude=(),
+        best_of=7,
+        n_jobs=None,
+        casts_chunk=200,
+    ):
+        """
+        How balanced the blind-pick equilibrium of each of ``casts`` is
+        (by default, every ``cast_subsets`` of ``size`` characters), ranked
+        from the most characters picked and the lowest top pick probability
+        down.
+
+        Casts of the same size are solved together, with their charts
+        gathered from this one's ``mu_matrix``, and their equilibria spread
+        over ``n_jobs`` worker processes.
+        """
+        if casts is None:
+            casts = cast_subsets(self.characters, size, include, exclude)
+        characters = pd.Index(self.characters)
+        by_size = defaultdict(list)
+        for cast in casts:
+            positions = characters.get_indexer(list(cast))
+            if (positions < 0).any():
+                raise KeyError(f"{cast} isn't limited to {list(characters)}")
+            by_size[len(cast)].append(positions)
+
+        names = np.asarray(self.characters)
+        balance = []
+        for positions in by_size.values():
+            positions = np.array(positions)
+            charts = self.mu_matrix[positions[:, :, None], positions[:, None, :]]
+            chunks = np.array_split(
+                np.arange(len(positions)), max(-(-len(positions) // casts_chunk), 1)
+            )
+            solved = Parallel(n_jobs=n_jobs)(
+                delayed(_solve_charts)(
+                    names[positions[chunk]], charts[chunk], best_of, self.solver
+                )
+                for chunk in chunks
+            )
+            picks = np.concatenate([picks for _, picks in solved])
+            picked = picks > 1e-9
+            entropy = -np.where(picked, picks * np.log(np.where(picked, picks, 1)), 0)
+            balance.append(
+                pd.DataFrame(
+                    {
+                        "cast": [tuple(cast) for cast in names[positions]],
+                        "size": positions.shape[1],
+                        "support": picked.sum(axis=1),
+                        "max_pick": picks.max(axis=1),
+                        "effective_picks": np.exp(entropy.sum(axis=1)),
+                    }
+                )
+            )
+        if not balance:
+            return pd.DataFrame(
+                columns=["cast", "size", "support", "max_pick", "effective_picks"]
+            )
+        return (
+            pd.concat(balance, ignore_index=True)
+            .sort_values(
+                ["support", "max_pick"], ascending=[False, True], kind="stable"
+            )
+            .reset_index(drop=True)
+        )
+
     def expected_r1_mus(self, best_of=7):
         nash = self.blind_pick_nash_eq(best_of=best_of)
         return [
@@ -79,110 +479,46 @@ class Nash:
             if p1_n * p2_n > 0
         ]
 
+    def expected_games_played(self, best_of=7):
+        """
+        The expected number of games played in each matchup, as a
+        ``(c1, c2)`` array, over a set that starts from both players' blind
+        pick equilibrium.
+        """
+        picks = np.array([prob for _, prob in self.blind_pick_nash_eq(best_of)])
+        return np.einsum("i,j,ijkl->kl", picks, picks, self.cp_games_played(best_of))
+
     def character_counts(self, best_of=7, p1=True):
+        counts = self.expected_games_played(best_of).sum(axis=1 if p1 else 0)
         return (
-            (
-                self.matchup_counts(best_of=best_of)
-                .reset_index()
-                .groupby("c1" if p1 else "c2")[0]
-                .sum()
+            pd.Series(
+                counts,
+                index=pd.Index(
+                    self.characters, name=self.mu_chart.index.names[0 if p1 else 1]
+                ),
             )
             .sort_values(ascending=False)
-            .astype(float)
             .round(2)
         )
 
     def matchup_counts(self, best_of=7):
-        return (
-            self.mu_chart.to_frame()
-            .apply(
-                lambda r: self.expected_match_count(
-                    r.name, self.expected_r1_mus(best_of=best_of)
-                ),
-                axis=1,
-            )
-            .sort_values()
-        )
-
-    def expected_match_count(self, mu, expected_r1):
-        return sum(
-            self.std_cp_games_played(mu, p1, 4, p2, 4) * Decimal(expected)
-            for ((p1, p2), expected) in expected_r1
-        )
+        c1, c2 = self._chart_positions()
+        return pd.Series(
+            self.expected_games_played(best_of)[c1, c2], index=self.mu_chart.index
+        ).sort_values()
 
     def optimal_counterpics(self, best_of=7):
-        wins_required = range(1, ((best_of + 1) // 2) + 1)
+        wins_required = (best_of + 1) // 2
+        payoffs = self.cp_payoffs(best_of)
+        characters = np.asarray(self.characters)
+        ranks = _name_ranks(characters, len(characters))
         return pd.DataFrame(
             {
-                "{}-{}".format(p1_req, p2_req): [
-                    min(
-                        (self.std_cp_payoff(p1, p1_req, p2, p2_req), p2)
-                        for p2 in self.characters
-                    )[1]
-                    for p1 in self.characters
+                "{}-{}".format(p1_req, p2_req): characters[
+                    _first_near_min(payoffs[p1_req, p2_req], ranks)
                 ]
-                for p1_req in range(1, 5)
-                for p2_req in range(1, 5)
+                for p1_req in range(1, wins_required + 1)
+                for p2_req in range(1, wins_required + 1)
             },
             index=self.characters,
         )
-
-    def std_cp_payoff(self, p1_playing, p1_req, p2_playing, p2_req):
-        key = (p1_playing, p1_req, p2_playing, p2_req)
-
-        if p1_req == 0:
-            return Decimal(1)
-        if p2_req == 0:
-            return Decimal(0)
-
-        if key not in self._std_cp_payoffs:
-            p1_win_chance = self.mu_chart.loc[p1_playing, p2_playing]
-            p1_win_rec = min(
-                self.std_cp_payoff(p1_playing, p1_req - 1, new_cp, p2_req)
-                for new_cp in self.characters
-            )
-            p2_win_rec = max(
-                self.std_cp_payoff(new_cp, p1_req, p2_playing, p2_req - 1)
-                for new_cp in self.characters
-            )
-            self._std_cp_payoffs[key] = (
-                p1_win_chance * p1_win_rec + (1 - p1_win_chance) * p2_win_rec
-            )
-
-        return self._std_cp_payoffs[key]
-
-    def std_cp_games_played(self, mu, p1_playing, p1_req, p2_playing, p2_req):
-        key = (mu, p1_playing, p1_req, p2_playing, p2_req)
-
-        if p1_req == 0:
-            return Decimal(0)
-        if p2_req == 0:
-            return Decimal(0)
-
-        if key not in self._std_cp_games_played:
-            p1_win_chance = self.mu_chart.loc[p1_playing, p2_playing]
-            p2_cp_payoffs = [
-                (self.std_cp_payoff(p1_playing, p1_req - 1, new_cp, p2_req), new_cp)
-                for new_cp in self.characters
-            ]
-            p2_best_cp_payoff, p2_cp = min(p2_cp_payoffs)
-            p2_played_rec = self.std_cp_games_played(
-                mu, p1_playing, p1_req - 1, p2_cp, p2_req
-            )
-            p1_cp_payoffs = [
-                (self.std_cp_payoff(new_cp, p1_req, p2_playing, p2_req - 1), new_cp)
-                for new_cp in self.characters
-            ]
-            p1_best_cp_payoff, p1_cp = max(p1_cp_payoffs)
-            p1_played_rec = self.std_cp_games_played(
-                mu, p1_cp, p1_req, p2_playing, p2_req - 1
-            )
-            played_one = 1 if mu == (p1_playing, p2_playing) else 0
-
-            self._std_cp_games_played[key] = (
-                played_one
-                + p1_win_chance * p2_played_rec
-                + (1 - p1_win_chance) * p1_played_rec
-            )
-
-        return self._std_cp_games_played[key]
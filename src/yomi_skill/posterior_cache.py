@@ -0,0 +1,103 @@
+import glob
+import hashlib
+import logging
+import os
+
+import arviz
+import numpy
+import pandas
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = "fits/posteriors"
+DEFAULT_CACHE_SIZE = 2 * 1024**3
+
+
+def fingerprint(*values):
+    digest = hashlib.md5()
+    for value in values:
+        _update_fingerprint(digest, value)
+    return digest.hexdigest()
+
+
+def _update_fingerprint(digest, value):
+    if isinstance(value, pandas.DataFrame):
+        digest.update(repr(list(value.columns)).encode())
+        for column in value.columns:
+            _update_fingerprint(digest, value[column])
+    elif isinstance(value, pandas.Series):
+        if isinstance(value.dtype, pandas.api.types.CategoricalDtype):
+            # The codes and category order define the model's coordinates, so
+            # hash them directly rather than the labels
+            digest.update(repr(list(value.dtype.categories)).encode())
+            digest.update(value.cat.codes.to_numpy().tobytes())
+        else:
+            digest.update(str(value.dtype).encode())
+            digest.update(
+                pandas.util.hash_pandas_object(value, index=False).to_numpy().tobytes()
+            )
+    elif isinstance(value, bytes):
+        digest.update(value)
+    elif isinstance(value, numpy.ndarray) and value.dtype != object:
+        digest.update(str(value.dtype).encode())
+        digest.update(repr(value.shape).encode())
+        digest.update(numpy.ascontiguousarray(value).tobytes())
+    else:
+        digest.update(repr(value).encode())
+
+
+class PosteriorCache:
+    """
+    On-disk store of fitted posteriors, keyed by content, that evicts the least
+    recently used entries once it grows beyond ``max_bytes``.
+    """
+
+    def __init__(self, root=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_CACHE_SIZE):
+        self.root = root
+        self.max_bytes = max_bytes
+
+    def path(self, key):
+        return os.path.join(self.root, f"{key}.nc")
+
+    def get(self, key):
+        path = self.path(key)
+        if not os.path.exists(path):
+            logger.info(f"Posterior cache miss for {key}")
+            return None
+
+        logger.info(f"Posterior cache hit for {key}")
+        # Reading counts as a use for the purposes of eviction
+        os.utime(path)
+        return arviz.from_netcdf(path)
+
+    def latest(self, prefix):
+        paths = glob.glob(os.path.join(self.root, f"{prefix}*.nc"))
+        if not paths:
+            return None
+
+        path = max(paths, key=os.path.getmtime)
+        logger.info(f"Using {path} as the latest cached posterior")
+        os.utime(path)
+        return arviz.from_netcdf(path)
+
+    def put(self, key, inf_data):
+        os.makedirs(self.root, exist_ok=True)
+        path = self.path(key)
+        partial = f"{path}.partial"
+        inf_data.to_netcdf(partial)
+        os.replace(partial, path)
+        self.evict()
+
+    def evict(self):
+        entries = sorted(
+            (os.stat(path).st_mtime, os.stat(path).st_size, path)
+            for path in glob.glob(os.path.join(self.root, "*.nc"))
+        )
+        total_bytes = sum(size for (_, size, _) in entries)
+        # Always keep the most recent entry, even if it alone is over budget
+        for _, size, path in entries[:-1]:
+            if total_bytes <= self.max_bytes:
+                break
+            logger.info(f"Evicting {path} from posterior cache")
+            os.remove(path)
+            total_bytes -= size
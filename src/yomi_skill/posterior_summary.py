@@ -0,0 +1,79 @@
+from typing import NamedTuple, Tuple
+
+import numpy
+import xarray
+
+from .model import _label_positions, take_positions
+
+SAMPLE_DIMS = ("chain", "draw")
+DEFAULT_QUANTILES = (0.03, 0.5, 0.97)
+
+
+class VariableSummary(NamedTuple):
+    dims: Tuple[str, ...]
+    mean: numpy.ndarray
+    std: numpy.ndarray
+    # Indexed by (quantile, *dims)
+    quantiles: numpy.ndarray
+
+
+class PosteriorSummary:
+    """
+    Mean, standard deviation and quantiles over all draws of each posterior
+    variable, as numpy arrays alongside the coordinate labels of their dims.
+
+    Variables are summarized the first time they're asked for, so that large
+    deterministics that nothing reads don't cost anything.
+    """
+
+    def __init__(self, posterior: xarray.Dataset, quantiles=DEFAULT_QUANTILES):
+        self.posterior = posterior
+        self.quantile_levels = tuple(quantiles)
+        self.coords = {
+            dim: posterior.indexes[dim]
+            for dim in posterior.dims
+            if dim not in SAMPLE_DIMS and dim in posterior.indexes
+        }
+        self.variables = {}
+
+    def __getitem__(self, name) -> VariableSummary:
+        if name not in self.variables:
+            values = self.posterior[name].transpose(*SAMPLE_DIMS, ...)
+            draws = values.to_numpy().reshape(-1, *values.shape[2:])
+            self.variables[name] = VariableSummary(
+                dims=values.dims[2:],
+                mean=draws.mean(axis=0),
+                std=draws.std(axis=0),
+                quantiles=numpy.quantile(draws, self.quantile_levels, axis=0),
+            )
+        return self.variables[name]
+
+    def names(self, suffix=""):
+        return [name for name in self.posterior.data_vars if name.endswith(suffix)]
+
+    def lookup(self, name, statistic="mean", **labels) -> numpy.ndarray:
+        """
+        ``statistic`` of ``name`` at arrays of coordinate labels (one per
+        dimension), with NaN where a label isn't a coordinate. Quantiles
+        have a leading axis, one entry per quantile level.
+        """
+        variable = self[name]
+        positions = tuple(
+            _label_positions(self.coords[dim], labels[dim]) for dim in variable.dims
+        )
+        if statistic == "quantiles":
+            return numpy.stack(
+                [take_positions(values, positions) for values in variable.quantiles]
+            )
+        return take_positions(getattr(variable, statistic), positions)
+
+    def to_xarray(self, name, statistic="mean") -> xarray.DataArray:
+        variable = self[name]
+        dims = variable.dims
+        coords = {dim: self.coords[dim] for dim in dims if dim in self.coords}
+        if statistic == "quantiles":
+            dims = ("quantile", *dims)
+            coords["quantile"] = list(self.quantile_levels)
+        return xarray.DataArray(
+            getattr(variable, statistic), dims=dims, coords=coords, name=name
+        )
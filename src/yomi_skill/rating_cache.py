@@ -0,0 +1,74 @@
+import inspect
+import logging
+import os
+
+import pandas
+
+from . import glicko, model
+from .games.yomi import historical_record
+from .posterior_cache import fingerprint
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RATING_CACHE_DIR = "fits/ratings"
+
+
+def prefit_key(tournament_games, sirlin_db_path, params):
+    """
+    Content key for ratings prefit on Yomi 1 games, covering the raw inputs,
+    the rating parameters (other than the initial time, which doesn't affect
+    the ratings) and the code that turns one into the other.
+    """
+    with open(sirlin_db_path, "rb") as sirlin_db:
+        sirlin_db_contents = sirlin_db.read()
+    return "yomi1-" + fingerprint(
+        tournament_games,
+        sirlin_db_contents,
+        sorted(
+            (name, value)
+            for name, value in params.items()
+            if not name.endswith("initial_time")
+        ),
+        inspect.getsource(glicko),
+        inspect.getsource(model),
+        inspect.getsource(historical_record),
+    )
+
+
+class RatingCache:
+    """
+    On-disk store of rating tables (as produced by ``Glicko2Estimator.ratings_``),
+    keyed by content.
+    """
+
+    def __init__(self, root=DEFAULT_RATING_CACHE_DIR):
+        self.root = root
+
+    def path(self, key):
+        return os.path.join(self.root, f"{key}.parquet")
+
+    def get(self, key):
+        path = self.path(key)
+        if not os.path.exists(path):
+            logger.info(f"Rating cache miss for {key}")
+            return None
+
+        logger.info(f"Rating cache hit for {key}")
+        tables = pandas.read_parquet(path)
+        return {
+            name: table.drop(columns="system").set_index("key").rename_axis(None)
+            for name, table in tables.groupby("system", observed=True, sort=False)
+        }
+
+    def put(self, key, tables):
+        os.makedirs(self.root, exist_ok=True)
+        path = self.path(key)
+        partial = f"{path}.partial"
+        pandas.concat(
+            [
+                table.rename_axis("key").reset_index().assign(system=name)
+                for name, table in tables.items()
+            ],
+            ignore_index=True,
+        ).astype({"system": "category"}).to_parquet(partial, compression="zstd")
+        os.replace(partial, path)
@@ -1,15 +1,25 @@
+import hashlib
 import json
 import os
 import re
+import resource
+import shutil
+import threading
+import time
+import zlib
 from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from typing import List
 from datetime import datetime
+from graphlib import TopologicalSorter
 
+import numpy
 import pandas
 import simplejson
 from IPython.core.display import display
 from sklearn.pipeline import Pipeline
-from functools import cached_property
+from sklearn.utils.parallel import Parallel, delayed
+from functools import cached_property, lru_cache
 
 
 def extract_index(col_name):
@@ -18,11 +28,686 @@ def extract_index(col_name):
     return field, indices
 
 
+def _perspective_columns(columns, player, opponent):
+    # Rename player {player}'s columns to ..._p/player and player {opponent}'s
+    # to ..._o/opponent
+    return {
+        col: re.sub(
+            r"([12])$",
+            lambda p: {opponent: "o", player: "p"}[p[1]],
+            col.replace(f"min_games__player_{opponent}_orig", "opponent").replace(
+                f"min_games__player_{player}_orig", "player"
+            ),
+        )
+        for col in columns
+    }
+
+
+def _tail_std(history, keys, column, window):
+    """
+    Sample std of the last ``window`` values of ``column`` (preceded by a 0)
+    in each ``keys`` group of the (ordered) ``history``, by group. This is
+    ``pandas.concat([pandas.Series([0]), group[column]]).rolling(window).std()``
+    at the end of every group, for all groups at once.
+    """
+    grouped = history.groupby(keys, observed=True)
+    tail = history.loc[
+        (grouped.cumcount(ascending=False) < window).to_numpy(), [*keys, column]
+    ]
+    sizes = grouped.size()
+    # Groups shorter than the window still include the leading 0
+    zeros = sizes.index[sizes < window].to_frame(index=False).assign(**{column: 0.0})
+    return (
+        pandas.concat([tail.astype({column: float}), zeros], ignore_index=True)
+        .groupby(keys, observed=True)[column]
+        .std()
+        .to_dict()
+    )
+
+
+def _category_counts(values):
+    codes = values.cat.codes.to_numpy()
+    return numpy.bincount(codes[codes >= 0], minlength=len(values.dtype.categories))
+
+
+OUTPUT_FORMATS = ["records", "compact"]
+COMPRESSIONS = ["gz", "br"]
+# Content hashes of the files from the last render, relative to its data_root
+MANIFEST = ".render-manifest.json"
+BLOCK_SIZE = 2**16
+
+
+def _compress_file(source, target, compression):
+    if compression == "gz":
+        # A gzip wrapper, with no file name or modification time
+        compressor = zlib.compressobj(9, zlib.DEFLATED, 31)
+        process, finish = compressor.compress, compressor.flush
+    else:
+        import brotli
+
+        compressor = brotli.Compressor(quality=11)
+        process, finish = compressor.process, compressor.finish
+    with open(source, "rb") as infile, open(target, "wb") as outfile:
+        for block in iter(lambda: infile.read(BLOCK_SIZE), b""):
+            outfile.write(process(block))
+        outfile.write(finish())
+
+
+def write_chunks(path, chunks, compress=(), previous_hash=None):
+    """
+    Stream the text ``chunks`` to ``path``, with a precompressed sibling
+    (``path.gz``, ``path.br``) for each compression in ``compress``, unless
+    the contents hash to ``previous_hash`` and all of those files already
+    exist. Siblings for compressions not in ``compress`` are removed.
+    Returns the content hash, whether the files were written, the bytes per
+    file, the size of the file that was replaced, and the time taken.
+    """
+    for compression in compress:
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown compression {compression!r}")
+    start = time.perf_counter()
+    previous = os.path.getsize(path) if os.path.exists(path) else 0
+    digest = hashlib.md5()
+    partial = f"{path}.partial"
+    with open(partial, "wb") as outfile:
+        for chunk in chunks:
+            contents = chunk.encode()
+            digest.update(contents)
+            outfile.write(contents)
+    digest = digest.hexdigest()
+    sizes = {"json": os.path.getsize(partial)}
+    written = digest != previous_hash or not all(
+        os.path.exists(sibling)
+        for sibling in [path, *(f"{path}.{compression}" for compression in compress)]
+    )
+    for compression in compress:
+        sibling = f"{path}.{compression}"
+        if written:
+            _compress_file(partial, f"{sibling}.partial", compression)
+            os.replace(f"{sibling}.partial", sibling)
+        sizes[compression] = os.path.getsize(sibling)
+    # Static hosts serve precompressed siblings in preference to the file
+    # itself, so remove any left over from a render that asked for them
+    for compression in COMPRESSIONS:
+        sibling = f"{path}.{compression}"
+        if compression not in compress and os.path.exists(sibling):
+            os.remove(sibling)
+    if written:
+        os.replace(partial, path)
+    else:
+        os.remove(partial)
+    return {
+        "path": path,
+        "file": os.path.basename(path),
+        "hash": digest,
+        "written": written,
+        "previous": previous,
+        **sizes,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def write_json(path, data, compact=False, compress=(), previous_hash=None):
+    """
+    ``write_chunks`` of ``data`` as JSON (minified if ``compact``).
+    """
+    if compact:
+        text = simplejson.dumps(
+            data, separators=(",", ":"), sort_keys=True, ignore_nan=True
+        )
+    else:
+        text = simplejson.dumps(data, indent=2, sort_keys=True, ignore_nan=True)
+    return write_chunks(path, [text], compress, previous_hash)
+
+
+_encode_value = simplejson.JSONEncoder(ignore_nan=True).encode
+
+
+@lru_cache(maxsize=None)
+def _fraction_digits(precision):
+    # The digits after the decimal point of each multiple of 10**-precision,
+    # as repr writes them
+    return numpy.array(
+        [
+            f"{fraction:0{precision}d}".rstrip("0") or "0"
+            for fraction in range(10**precision)
+        ],
+        dtype=object,
+    )
+
+
+def _json_floats(values, precision):
+    # Round as pandas' to_json does, to the nearest multiple of 10**-precision
+    # (breaking ties towards an odd last digit, or up from 0), and write that
+    # multiple as repr writes the nearest float, which is what simplejson
+    # gives after parsing to_json's output. That's its decimal digits, for
+    # values small enough that no shorter number rounds to the same float.
+    # Values that to_json writes in exponent form, or that are too large, are
+    # left to it.
+    scale = 10**precision
+    magnitude = numpy.abs(values)
+    with numpy.errstate(invalid="ignore"):
+        exact = (magnitude < 1e9) & ((magnitude >= 1e-15) | (magnitude == 0))
+        whole = numpy.floor(magnitude)
+        scaled = (magnitude - whole) * scale
+        fraction = numpy.floor(scaled)
+        diff = scaled - fraction
+        fraction += (diff > 0.5) | (
+            (diff == 0.5) & ((fraction == 0) | (fraction % 2 == 1))
+        )
+        # Carry fractions that round up to a whole number
+        whole += fraction == scale
+        fraction[fraction == scale] = 0
+        whole = numpy.where(exact, whole, 0).astype(numpy.int64)
+        fraction = numpy.where(exact, fraction, 0).astype(numpy.int64)
+    encoded = (
+        numpy.array(["", "-"], dtype=object)[(values < 0).astype(int)]
+        + numpy.array(list(map(str, whole.tolist())), dtype=object)
+        + "."
+        + _fraction_digits(precision)[fraction]
+    ).tolist()
+    for position in numpy.flatnonzero(~exact):
+        encoded[position] = (
+            "null"
+            if numpy.isnan(values[position])
+            else _fallback_values(pandas.Series(values[[position]]), precision)[0]
+        )
+    return encoded
+
+
+def _fallback_values(column, precision):
+    return [
+        _encode_value(value)
+        for value in json.loads(
+            column.to_json(orient="values", double_precision=precision)
+        )
+    ]
+
+
+@lru_cache(maxsize=None)
+def _category_labels(dtype):
+    # The JSON of each (string) category, with missing values (code -1)
+    # mapping to the trailing null
+    if not all(isinstance(category, str) for category in dtype.categories):
+        return None
+    return numpy.array(
+        [
+            simplejson.encoder.encode_basestring_ascii(category)
+            for category in dtype.categories
+        ]
+        + ["null"],
+        dtype=object,
+    )
+
+
+def _json_encoder(column, precision):
+    # A function from a slice of the rows of column to the JSON of each value
+    dtype = column.dtype
+    if isinstance(dtype, pandas.api.types.CategoricalDtype):
+        labels = _category_labels(dtype)
+        if labels is not None:
+            codes = column.array.codes
+            return lambda rows: labels[codes[rows]].tolist()
+    elif dtype.kind == "M":
+        # Milliseconds since the epoch, to_json's default for dates
+        nanos = column.array.as_unit("ns").asi8
+        missing = column.array.isna()
+        if (nanos[~missing] >= 0).all():
+
+            def encode(rows):
+                millis = list(map(str, (nanos[rows] // 10**6).tolist()))
+                for position in numpy.flatnonzero(missing[rows]):
+                    millis[position] = "null"
+                return millis
+
+            return encode
+    elif isinstance(dtype, numpy.dtype):
+        values = column.to_numpy()
+        if dtype.kind == "b":
+            return lambda rows: numpy.where(values[rows], "true", "false").tolist()
+        if dtype.kind in "iu":
+            return lambda rows: list(map(str, values[rows].tolist()))
+        if dtype.kind == "f":
+            return lambda rows: _json_floats(values[rows], precision)
+        if dtype.kind == "O" and pandas.isna(values).all():
+            return lambda rows: ["null"] * len(values[rows])
+    return lambda rows: _fallback_values(column.iloc[rows], precision)
+
+
+def json_blocks(frame: pandas.DataFrame, columns, rows=1024, precision=3):
+    """
+    The JSON of each value in ``columns`` of ``frame``, exactly as simplejson
+    would encode the values from ``json.loads(frame.to_json(
+    double_precision=precision))``, by column, for a block of ``rows`` rows at
+    a time.
+    """
+    series = {column: frame[column] for column in columns}
+    floats = [
+        column
+        for column, values in series.items()
+        if isinstance(values.dtype, numpy.dtype) and values.dtype.kind == "f"
+    ]
+    # The float columns are encoded together, in one pass per block
+    float_values = numpy.column_stack(
+        [series[column].to_numpy(float) for column in floats]
+        or [numpy.empty((len(frame), 0))]
+    )
+    encoders = {
+        column: _json_encoder(values, precision)
+        for column, values in series.items()
+        if column not in floats
+    }
+    for start in range(0, len(frame), rows):
+        block = slice(start, start + rows)
+        block_floats = float_values[block]
+        encoded_floats = _json_floats(block_floats.T.ravel(), precision)
+        size = len(block_floats)
+        yield {
+            **{
+                column: encoded_floats[index * size : (index + 1) * size]
+                for index, column in enumerate(floats)
+            },
+            **{column: encode(block) for column, encode in encoders.items()},
+        }
+
+
+def _history_chunks(history, compact, rows=1024, precision=3):
+    # The JSON that simplejson.dumps(..., sort_keys=True) gives for history's
+    # records (indented) or columns (if compact), as read back from to_json,
+    # written a block of rows at a time
+    columns = sorted(history.columns)
+    keys = [simplejson.encoder.encode_basestring_ascii(column) for column in columns]
+    if compact:
+        # Each column is written whole before the next, so columns are only
+        # encoded together when all of the rows fit in a single block
+        single_block = len(history) <= rows
+        if single_block:
+            encoded = next(json_blocks(history, columns, rows, precision), None)
+        yield "{"
+        for index, (column, key) in enumerate(zip(columns, keys)):
+            yield f"{',' if index else ''}{key}:["
+            if single_block:
+                blocks = [encoded[column]] if encoded else []
+            else:
+                blocks = (
+                    encoded[column]
+                    for encoded in json_blocks(history, [column], rows, precision)
+                )
+            for block, values in enumerate(blocks):
+                yield f"{',' if block else ''}{','.join(values)}"
+            yield "]"
+        yield "}"
+        return
+
+    if history.empty:
+        yield "[]"
+        return
+    record = (
+        "  {\n"
+        + ",\n".join(f"    {key.replace('%', '%%')}: %s" for key in keys)
+        + "\n  }"
+    )
+    yield "[\n"
+    for block, encoded in enumerate(json_blocks(history, columns, rows, precision)):
+        values = zip(*(encoded[column] for column in columns))
+        yield (",\n" if block else "") + ",\n".join(record % row for row in values)
+    yield "\n]"
+
+
+def _write_player_details(
+    player_folder, history, skill, compact, compress, previous_hashes
+):
+    os.makedirs(player_folder, exist_ok=True)
+    history = history.sort_values("render__match_date")
+    return [
+        write_chunks(
+            f"{player_folder}/history.json",
+            _history_chunks(history, compact),
+            compress,
+            previous_hashes.get("history.json"),
+        ),
+        write_json(
+            f"{player_folder}/skill.json",
+            skill,
+            compact,
+            compress,
+            previous_hashes.get("skill.json"),
+        ),
+    ]
+
+
+# The intermediates (cached properties of YomiRender) that each intermediate
+# and render step reads, so that run_steps can compute each one once, before
+# anything that needs it, and run steps as soon as their inputs are ready
+RENDER_DEPENDENCIES = {
+    "previous_manifest": [],
+    "category_counts": [],
+    "public_games": [],
+    "public_players": ["public_games"],
+    "player_character_counts": [],
+    "player_game_counts": ["public_players"],
+    "player_histories": ["public_games"],
+    "ratings_data": [],
+    "elo_transformer": [],
+    "glicko_transformer": [],
+    "pc_elo_transformer": [],
+    "pc_glicko_transformer": [],
+    "posterior_summary": [],
+    "rating_by_pc": ["ratings_data"],
+    "player_character_ratings_history": ["rating_by_pc"],
+    "player_character_ratings_devs": ["player_character_ratings_history"],
+    "player_character_ratings": [
+        "player_character_ratings_history",
+        "pc_elo_transformer",
+        "pc_glicko_transformer",
+    ],
+    "top_glicko_by_character": ["player_character_ratings_history", "public_players"],
+    "rating_by_player": ["ratings_data"],
+    "player_ratings_history": ["rating_by_player"],
+    "player_ratings_devs": ["player_ratings_history"],
+    "player_ratings": [
+        "player_ratings_history",
+        "elo_transformer",
+        "glicko_transformer",
+    ],
+    "render_aggregate_skill": [
+        "previous_manifest",
+        "player_character_ratings",
+        "player_ratings",
+        "top_glicko_by_character",
+    ],
+    "render_players": [
+        "previous_manifest",
+        "public_players",
+        "player_ratings",
+        "player_ratings_devs",
+        "player_game_counts",
+    ],
+    "render_characters": ["previous_manifest", "category_counts"],
+    "render_matchup_data": [
+        "previous_manifest",
+        "category_counts",
+        "posterior_summary",
+    ],
+    "render_player_details": [
+        "previous_manifest",
+        "public_players",
+        "player_histories",
+        "player_character_counts",
+        "player_character_ratings",
+        "player_character_ratings_devs",
+        "player_ratings",
+        "player_ratings_devs",
+        "player_game_counts",
+    ],
+    "render_scales": [
+        "previous_manifest",
+        "posterior_summary",
+        "elo_transformer",
+        "pc_elo_transformer",
+    ],
+    "render_gem_effects": [
+        "previous_manifest",
+        "category_counts",
+        "posterior_summary",
+    ],
+}
+YOMI1_RENDER_STEPS = [
+    "render_aggregate_skill",
+    "render_players",
+    "render_characters",
+    "render_matchup_data",
+    "render_player_details",
+    "render_scales",
+]
+YOMI2_RENDER_STEPS = [*YOMI1_RENDER_STEPS, "render_gem_effects"]
+
+
+def _resident_memory():
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # Only the peak so far is available without /proc
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class _PeakMemory:
+    """
+    Samples the resident memory of the process in a background thread, to
+    track its peak while each running task is in progress.
+    """
+
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.peaks = {}
+        self.running = set()
+        self.stopped = threading.Event()
+        self.sampler = threading.Thread(target=self.sample, daemon=True)
+
+    def __enter__(self):
+        self.sampler.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.sampler.join()
+
+    def sample(self):
+        while not self.stopped.wait(self.interval):
+            self.update()
+
+    def update(self):
+        memory = _resident_memory()
+        for name in list(self.running):
+            self.peaks[name] = max(self.peaks[name], memory)
+
+    def start(self, name):
+        self.peaks[name] = _resident_memory()
+        self.running.add(name)
+        return self.peaks[name]
+
+    def stop(self, name):
+        self.update()
+        self.running.discard(name)
+        return self.peaks[name]
+
+
 class YomiRender:
-    def __init__(self, pipeline: Pipeline, data_root):
+    def __init__(
+        self,
+        pipeline: Pipeline,
+        data_root,
+        output_format="records",
+        compress=(),
+        incremental=True,
+    ):
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown output format {output_format!r}")
         self.pipeline = pipeline
         self.model = pipeline["model"]
         self.data_root = data_root
+        self.output_format = output_format
+        self.compress = tuple(compress)
+        self.incremental = incremental
+        self.output_stats = []
+        self.removed_files = 0
+        self.step_stats = []
+
+    @property
+    def manifest_path(self):
+        return f"{self.data_root}/{MANIFEST}"
+
+    @cached_property
+    def previous_manifest(self):
+        """
+        Content hashes of the files written by the previous render, by path
+        relative to ``data_root``.
+        """
+        if not self.incremental or not os.path.exists(self.manifest_path):
+            return {}
+        with open(self.manifest_path) as manifest:
+            return json.load(manifest)
+
+    def previous_hash(self, path):
+        return self.previous_manifest.get(os.path.relpath(path, self.data_root))
+
+    def write_json(self, path, data):
+        self.output_stats.append(
+            write_json(
+                path,
+                data,
+                self.output_format == "compact",
+                self.compress,
+                self.previous_hash(path),
+            )
+        )
+
+    def remove_dropped_players(self):
+        player_root = os.path.normpath(f"{self.data_root}/player")
+        if not os.path.isdir(player_root):
+            return
+        # Player names can contain "/", so keep every folder that was written
+        # to in this render, and the folders that contain them, rather than
+        # matching top-level folders against player names
+        keep = set()
+        for stats in self.output_stats:
+            folder = os.path.dirname(os.path.normpath(stats["path"]))
+            while os.path.commonpath([folder, player_root]) == player_root:
+                if folder == player_root or folder in keep:
+                    break
+                keep.add(folder)
+                folder = os.path.dirname(folder)
+        for root, folders, _ in os.walk(player_root):
+            for folder in list(folders):
+                path = os.path.join(root, folder)
+                if path in keep:
+                    continue
+                folders.remove(folder)
+                self.removed_files += sum(len(files) for (_, _, files) in os.walk(path))
+                shutil.rmtree(path)
+
+    def write_manifest(self):
+        os.makedirs(self.data_root, exist_ok=True)
+        with open(self.manifest_path, "w") as manifest:
+            json.dump(
+                {
+                    os.path.relpath(stats["path"], self.data_root): stats["hash"]
+                    for stats in self.output_stats
+                },
+                manifest,
+                indent=2,
+                sort_keys=True,
+            )
+
+    def report_output(self):
+        stats = pandas.DataFrame(self.output_stats)
+        if stats.empty:
+            return
+        written = int(stats.written.sum())
+        print(
+            f"Wrote {written} files, skipped {len(stats) - written} unchanged files, "
+            f"and removed {self.removed_files} files of dropped players"
+        )
+        summary = stats.groupby("file").agg(
+            files=("file", "size"),
+            written=("written", "sum"),
+            **{
+                column: (column, "sum")
+                for column in ["previous", "json", *self.compress, "seconds"]
+            },
+        )
+        summary.loc["total"] = summary.sum()
+        print(f"Output size (bytes) and write time in {self.output_format} format")
+        print(
+            summary.astype({"files": int, "written": int, "previous": int, "json": int})
+            .astype({compression: int for compression in self.compress})
+            .to_string(float_format="{:.2f}".format)
+        )
+
+    def run_steps(self, steps, workers=None, n_jobs=None):
+        """
+        Run the render ``steps``, and the intermediates they depend on, on a
+        pool of ``workers`` threads, each as soon as its dependencies are done.
+        """
+        graph = {}
+        names = list(steps)
+        while names:
+            name = names.pop()
+            if name not in graph:
+                if name not in RENDER_DEPENDENCIES:
+                    raise ValueError(f"Unknown render step {name!r}")
+                graph[name] = RENDER_DEPENDENCIES[name]
+                names.extend(graph[name])
+        order = TopologicalSorter(graph)
+        # Raises CycleError for a cycle in RENDER_DEPENDENCIES, rather than
+        # waiting forever for a step that can never start
+        order.prepare()
+
+        started = time.perf_counter()
+        with _PeakMemory() as memory, ThreadPoolExecutor(workers) as executor:
+            running = {}
+            while order.is_active():
+                for name in order.get_ready():
+                    future = executor.submit(
+                        self.run_step, name, memory, started, n_jobs
+                    )
+                    running[future] = name
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    self.step_stats.append(future.result())
+                    order.done(running.pop(future))
+
+    def run_step(self, name, memory, started, n_jobs=None):
+        initial_memory = memory.start(name)
+        start = time.perf_counter()
+        if name == "render_player_details":
+            self.render_player_details(n_jobs=n_jobs)
+        elif name.startswith("render_"):
+            getattr(self, name)()
+        else:
+            getattr(self, name)
+        end = time.perf_counter()
+        return {
+            "step": name,
+            "start": start - started,
+            "seconds": end - start,
+            "initial_memory": initial_memory,
+            "peak_memory": memory.stop(name),
+        }
+
+    def report_timings(self):
+        stats = pandas.DataFrame(self.step_stats)
+        if stats.empty:
+            return
+        stats = stats.sort_values("start").set_index("step")
+        stats["peak_mb"] = stats.peak_memory / 2**20
+        stats["added_mb"] = (stats.peak_memory - stats.initial_memory) / 2**20
+        print(
+            f"Render steps, in {(stats.start + stats.seconds).max():.2f}s "
+            "(memory is for the whole process, so is shared by concurrent steps)"
+        )
+        print(
+            stats[["start", "seconds", "peak_mb", "added_mb"]].to_string(
+                float_format="{:.2f}".format
+            )
+        )
+
+    @cached_property
+    def posterior_summary(self):
+        return self.model.posterior_summary
+
+    @cached_property
+    def category_counts(self):
+        """
+        Number of games in each category of every categorical column of the
+        model data, in category order.
+        """
+        return {
+            column: _category_counts(values)
+            for column, values in self.model.data_.items()
+            if isinstance(values.dtype, pandas.api.types.CategoricalDtype)
+        }
 
     @cached_property
     def public_games(self):
@@ -72,21 +757,11 @@ class YomiRender:
 
     @cached_property
     def player_character_ratings_devs(self):
-        return (
-            {
-                (player, character): pandas.concat(
-                    [pandas.Series([0]), matches["pc_elo"]]
-                )
-                .rolling(50, min_periods=0)
-                .std()
-                .iloc[-1]
-                for (
-                    player,
-                    character,
-                ), matches in self.player_character_ratings_history
-            }
-            if "pc_elo" in self.rating_by_pc.columns
-            else {}
+        return _tail_std(
+            self.player_character_ratings_history.obj,
+            ["player", "character"],
+            "pc_elo",
+            window=50,
         )
 
     @cached_property
@@ -188,25 +863,33 @@ class YomiRender:
 
     @cached_property
     def top_glicko_by_character(self):
-        return {
-            character: [
-                {
-                    "player": player,
-                    "r": round(row.pc_glicko_r, 0),
-                    "rd": round(row.pc_glicko_rd, 2),
-                    "v": round(row.pc_glicko_v, 3),
-                }
-                for (player, _), row in pc_ratings.sort_values(
-                    "pc_glicko_r", ascending=False, kind="stable"
-                )
-                .head(20)
-                .iterrows()
-            ]
-            for character, pc_ratings in self.player_character_ratings_history.last()
+        ratings = (
+            self.player_character_ratings_history.last()
             .loc[self.public_players, :]
             .dropna(subset=["pc_glicko_r"])
-            .groupby("character")
+            .reset_index()
+            .sort_values("pc_glicko_r", ascending=False, kind="stable")
+        )
+        top = ratings.groupby("character", observed=True).head(20)
+        top_by_character = {
+            character: [] for character in ratings.character.cat.categories
         }
+        for player, character, r, rd, v in zip(
+            top.player,
+            top.character,
+            top.pc_glicko_r,
+            top.pc_glicko_rd,
+            top.pc_glicko_v,
+        ):
+            top_by_character[character].append(
+                {
+                    "player": player,
+                    "r": round(r, 0),
+                    "rd": round(rd, 2),
+                    "v": round(v, 3),
+                }
+            )
+        return top_by_character
 
     @cached_property
     def player_character_ratings(self):
@@ -288,17 +971,7 @@ class YomiRender:
 
     @cached_property
     def player_ratings_devs(self):
-        return (
-            {
-                player: pandas.concat([pandas.Series([0]), matches["elo"]])
-                .rolling(30, min_periods=1)
-                .std()
-                .iloc[-1]
-                for player, matches in self.player_ratings_history
-            }
-            if "elo" in self.rating_by_player.columns
-            else {}
-        )
+        return _tail_std(self.player_ratings_history.obj, ["player"], "elo", window=30)
 
     @cached_property
     def player_ratings(self):
@@ -348,134 +1021,178 @@ class YomiRender:
         return self.pipeline["transform"].named_transformers_.get("pc_glicko")
 
     def render_scales(self):
-        col_means = self.model.inf_data_["posterior"].mean(["chain", "draw"])
-        col_std = self.model.inf_data_["posterior"].std(["chain", "draw"])
+        summary = self.posterior_summary
 
         os.makedirs(self.data_root, exist_ok=True)
-        with open(f"{self.data_root}/scales.json", "w") as outfile:
-            simplejson.dump(
-                {
-                    **{
-                        re.sub(r"_\w", lambda m: m[0][1].upper(), column)
-                        + "Mean": round(float(col_means[column]), 2)
-                        for column in col_means.data_vars.keys()
-                        if column.endswith("scale")
-                    },
-                    **{
-                        re.sub(r"_\w", lambda m: m[0][1].upper(), column)
-                        + "Std": round(float(col_std[column]), 2)
-                        for column in col_std.data_vars.keys()
-                        if column.endswith("scale")
-                    },
-                    **(
-                        {"eloFactor": self.elo_transformer.rating_factor or 400}
-                        if self.elo_transformer
-                        else {}
-                    ),
-                    **(
-                        {"pcEloFactor": self.pc_elo_transformer.rating_factor or 400}
-                        if self.pc_elo_transformer
-                        else {}
-                    ),
-                    "renderedAt": datetime.now().isoformat(),
+        self.write_json(
+            f"{self.data_root}/scales.json",
+            {
+                **{
+                    re.sub(r"_\w", lambda m: m[0][1].upper(), column)
+                    + "Mean": round(float(summary[column].mean), 2)
+                    for column in summary.names("scale")
                 },
-                outfile,
-                indent=2,
-                sort_keys=True,
-                ignore_nan=True,
-            )
+                **{
+                    re.sub(r"_\w", lambda m: m[0][1].upper(), column)
+                    + "Std": round(float(summary[column].std), 2)
+                    for column in summary.names("scale")
+                },
+                **(
+                    {"eloFactor": self.elo_transformer.rating_factor or 400}
+                    if self.elo_transformer
+                    else {}
+                ),
+                **(
+                    {"pcEloFactor": self.pc_elo_transformer.rating_factor or 400}
+                    if self.pc_elo_transformer
+                    else {}
+                ),
+                "renderedAt": datetime.now().isoformat(),
+            },
+        )
 
-    def render_player_details(self):
-        print(f"Computing per-player data for {len(self.public_players)} players")
-        for player in self.public_players:
-            p1_games = self.public_games[
-                (self.public_games.min_games__player_1_orig == player)
-            ].rename(
-                columns={
-                    col: re.sub(
-                        r"([12])$",
-                        lambda p: {"2": "o", "1": "p"}[p[1]],
-                        col.replace("min_games__player_2_orig", "opponent").replace(
-                            "min_games__player_1_orig", "player"
+    @cached_property
+    def player_histories(self):
+        """
+        Every public game from the perspective of each of its players (with
+        ``p`` columns for the player and ``o`` columns for their opponent),
+        grouped by player.
+        """
+        p1_games = self.public_games.rename(
+            columns=_perspective_columns(self.public_games.columns, "1", "2")
+        )
+        p2_games = self.public_games.rename(
+            columns=_perspective_columns(self.public_games.columns, "2", "1")
+        )
+        p2_games.render__win = 1 - p2_games.render__win
+        # Within each group, a player's games as player 1 come before their
+        # games as player 2, as they did when each player was extracted
+        # separately, so that sorting by date breaks ties the same way
+        return pandas.concat([p1_games, p2_games]).groupby(
+            "player", sort=False, observed=True
+        )
+
+    def player_skill(self, player):
+        return {
+            "char": {
+                character: {
+                    "gamesPlayed": int(
+                        self.player_character_counts[player].get(character, 0)
+                    ),
+                    "elo": round(
+                        self.player_character_ratings.loc[player, character].pc_elo,
+                        0,
+                    ),
+                    "elo_std": round(
+                        self.player_character_ratings_devs.get(
+                            (player, character), 1060
                         ),
-                    )
-                    for col in self.public_games.columns
+                        2,
+                    ),
+                    "glickoR": round(
+                        self.player_character_ratings.loc[
+                            player, character
+                        ].pc_glicko_r,
+                        2,
+                    ),
+                    "glickoRD": round(
+                        self.player_character_ratings.loc[
+                            player, character
+                        ].pc_glicko_rd,
+                        2,
+                    ),
+                    "glickoV": round(
+                        self.player_character_ratings.loc[
+                            player, character
+                        ].pc_glicko_v,
+                        3,
+                    ),
                 }
+                for character in self.model.data_.matchup__character_1.dtype.categories.values
+            },
+            "elo": round(self.player_ratings.loc[player].elo or 1500.0, 0),
+            "elo_std": round(self.player_ratings_devs.get(player, 1060), 2),
+            "glickoR": round(
+                self.player_ratings.loc[player].glicko_r,
+                0,
+            ),
+            "glickoRD": round(
+                self.player_ratings.loc[player].glicko_rd,
+                2,
+            ),
+            "glickoV": round(
+                self.player_ratings.loc[player].glicko_v,
+                3,
+            ),
+            "gamesPlayed": int(self.player_game_counts[player]),
+        }
+
+    def render_player_details(self, n_jobs=None):
+        print(f"Computing per-player data for {len(self.public_players)} players")
+        start = datetime.now()
+        histories = self.player_histories
+        details = [
+            (
+                f"{self.data_root}/player/{player}",
+                histories.get_group(player),
+                self.player_skill(player),
             )
-            p2_games = self.public_games[
-                (self.public_games.min_games__player_2_orig == player)
-            ].rename(
-                columns={
-                    col: re.sub(
-                        r"([12])$",
-                        lambda p: {"1": "o", "2": "p"}[p[1]],
-                        col.replace("min_games__player_1_orig", "opponent").replace(
-                            "min_games__player_2_orig", "player"
-                        ),
-                    )
-                    for col in self.public_games.columns
-                }
+            for player in self.public_players
+        ]
+        previous_hashes = [
+            {
+                name: self.previous_hash(f"{player_folder}/{name}")
+                for name in ["history.json", "skill.json"]
+            }
+            for (player_folder, _, _) in details
+        ]
+        extracted = datetime.now()
+        for player_stats in Parallel(n_jobs=n_jobs)(
+            delayed(_write_player_details)(
+                *player_details,
+                self.output_format == "compact",
+                self.compress,
+                player_hashes,
             )
-            p2_games.render__win = 1 - p2_games.render__win
-
-            player_folder = f"{self.data_root}/player/{player}"
-            os.makedirs(player_folder, exist_ok=True)
-            with open(f"{player_folder}/history.json", "w") as outfile:
-                simplejson.dump(
-                    json.loads(
-                        pandas.concat([p1_games, p2_games])
-                        .sort_values("render__match_date")
-                        .to_json(orient="records", double_precision=3)
-                    ),
-                    outfile,
-                    indent=2,
-                    sort_keys=True,
-                    ignore_nan=True,
+            for player_details, player_hashes in zip(details, previous_hashes)
+        ):
+            self.output_stats.extend(player_stats)
+        self.remove_dropped_players()
+        end = datetime.now()
+        print(
+            f"Rendered per-player data for {len(details)} players in {end - start} "
+            f"(extract: {extracted - start}, write: {end - extracted}, "
+            f"n_jobs={n_jobs})"
+        )
+
+    def render_characters(self):
+        character_counts = (
+            self.category_counts["matchup__character_1"]
+            + self.category_counts["matchup__character_2"]
+        )
+        os.makedirs(self.data_root, exist_ok=True)
+        self.write_json(
+            f"{self.data_root}/characters.json",
+            [
+                {
+                    "character": character,
+                    "gamesRecorded": int(count),
+                }
+                for character, count in zip(
+                    self.model.data_.matchup__character_1.dtype.categories.values,
+                    character_counts,
                 )
+            ],
+        )
 
-            with open(f"{player_folder}/skill.json", "w") as outfile:
-                simplejson.dump(
+    def render_players(self):
+        os.makedirs(self.data_root, exist_ok=True)
+        self.write_json(
+            f"{self.data_root}/players.json",
+            sorted(
+                [
                     {
-                        "char": {
-                            character: {
-                                "gamesPlayed": int(
-                                    self.player_character_counts[player].get(
-                                        character, 0
-                                    )
-                                ),
-                                "elo": round(
-                                    self.player_character_ratings.loc[
-                                        player, character
-                                    ].pc_elo,
-                                    0,
-                                ),
-                                "elo_std": round(
-                                    self.player_character_ratings_devs.get(
-                                        (player, character), 1060
-                                    ),
-                                    2,
-                                ),
-                                "glickoR": round(
-                                    self.player_character_ratings.loc[
-                                        player, character
-                                    ].pc_glicko_r,
-                                    2,
-                                ),
-                                "glickoRD": round(
-                                    self.player_character_ratings.loc[
-                                        player, character
-                                    ].pc_glicko_rd,
-                                    2,
-                                ),
-                                "glickoV": round(
-                                    self.player_character_ratings.loc[
-                                        player, character
-                                    ].pc_glicko_v,
-                                    3,
-                                ),
-                            }
-                            for character in self.model.data_.matchup__character_1.dtype.categories.values
-                        },
+                        "player": player,
                         "elo": round(self.player_ratings.loc[player].elo or 1500.0, 0),
                         "elo_std": round(self.player_ratings_devs.get(player, 1060), 2),
                         "glickoR": round(
@@ -491,81 +1208,13 @@ class YomiRender:
                             3,
                         ),
                         "gamesPlayed": int(self.player_game_counts[player]),
-                    },
-                    outfile,
-                    indent=2,
-                    sort_keys=True,
-                    ignore_nan=True,
-                )
-
-    def render_characters(self):
-        character_counts = (
-            pandas.concat(
-                [
-                    self.model.data_.matchup__character_1.rename("character"),
-                    self.model.data_.matchup__character_2.rename("character"),
-                ]
-            )
-            .to_frame()
-            .groupby("character")
-            .size()
-        ).dropna()
-        os.makedirs(self.data_root, exist_ok=True)
-        with open(f"{self.data_root}/characters.json", "w") as outfile:
-            simplejson.dump(
-                [
-                    {
-                        "character": character,
-                        "gamesRecorded": int(character_counts[character]),
                     }
-                    for character in list(
-                        self.model.data_.matchup__character_1.dtype.categories.values
-                    )
+                    for player in self.public_players
                 ],
-                outfile,
-                indent=2,
-                sort_keys=True,
-                ignore_nan=True,
-            )
-
-    def render_players(self):
-        os.makedirs(self.data_root, exist_ok=True)
-        with open(f"{self.data_root}/players.json", "w") as outfile:
-            simplejson.dump(
-                sorted(
-                    [
-                        {
-                            "player": player,
-                            "elo": round(
-                                self.player_ratings.loc[player].elo or 1500.0, 0
-                            ),
-                            "elo_std": round(
-                                self.player_ratings_devs.get(player, 1060), 2
-                            ),
-                            "glickoR": round(
-                                self.player_ratings.loc[player].glicko_r,
-                                0,
-                            ),
-                            "glickoRD": round(
-                                self.player_ratings.loc[player].glicko_rd,
-                                2,
-                            ),
-                            "glickoV": round(
-                                self.player_ratings.loc[player].glicko_v,
-                                3,
-                            ),
-                            "gamesPlayed": int(self.player_game_counts[player]),
-                        }
-                        for player in self.public_players
-                    ],
-                    key=lambda player: player["glickoR"],
-                    reverse=True,
-                ),
-                outfile,
-                indent=2,
-                sort_keys=True,
-                ignore_nan=True,
-            )
+                key=lambda player: player["glickoR"],
+                reverse=True,
+            ),
+        )
 
     def render_aggregate_skill(self):
         print("Computing player skill")
@@ -586,95 +1235,95 @@ class YomiRender:
         pprint.pprint(player_ratings_std)
 
         os.makedirs(self.data_root, exist_ok=True)
-        with open(f"{self.data_root}/playerSkill.json", "w") as outfile:
-            simplejson.dump(
-                {
-                    "globalSkill": {
+        self.write_json(
+            f"{self.data_root}/playerSkill.json",
+            {
+                "globalSkill": {
+                    "elo": {
+                        "qs": player_ratings_qs.elo.round(0).to_dict(),
+                        "std": player_ratings_std.round(2).elo,
+                    },
+                    "glicko": {
+                        "r": {
+                            "qs": player_ratings_qs.glicko_r.round(0).to_dict(),
+                            "std": player_ratings_std.round(3).glicko_r,
+                        },
+                        "rd": {
+                            "qs": player_ratings_qs.glicko_rd.round(2).to_dict(),
+                            "std": player_ratings_std.round(3).glicko_rd,
+                        },
+                        "v": {
+                            "qs": player_ratings_qs.glicko_v.round(2).to_dict(),
+                            "std": player_ratings_std.round(3).glicko_v,
+                        },
+                    },
+                },
+                "characters": {
+                    character: {
                         "elo": {
-                            "qs": player_ratings_qs.elo.round(0).to_dict(),
-                            "std": player_ratings_std.round(2).elo,
+                            "qs": character_qs.pc_elo.loc[character].round(0).to_dict(),
+                            "std": character_std.pc_elo.round(2).loc[character],
                         },
                         "glicko": {
+                            "top20": self.top_glicko_by_character.get(character, []),
                             "r": {
-                                "qs": player_ratings_qs.glicko_r.round(0).to_dict(),
-                                "std": player_ratings_std.round(3).glicko_r,
+                                "qs": character_qs.pc_glicko_r.loc[character]
+                                .round(0)
+                                .to_dict(),
+                                "std": character_std.pc_glicko_r.round(2).loc[
+                                    character
+                                ],
                             },
                             "rd": {
-                                "qs": player_ratings_qs.glicko_rd.round(2).to_dict(),
-                                "std": player_ratings_std.round(3).glicko_rd,
+                                "qs": character_qs.pc_glicko_rd.loc[character]
+                                .round(2)
+                                .to_dict(),
+                                "std": character_std.pc_glicko_rd.round(3).loc[
+                                    character
+                                ],
                             },
                             "v": {
-                                "qs": player_ratings_qs.glicko_v.round(2).to_dict(),
-                                "std": player_ratings_std.round(3).glicko_v,
-                            },
-                        },
-                    },
-                    "characters": {
-                        character: {
-                            "elo": {
-                                "qs": character_qs.pc_elo.loc[character]
-                                .round(0)
+                                "qs": character_qs.pc_glicko_v.loc[character]
+                                .round(2)
                                 .to_dict(),
-                                "std": character_std.pc_elo.round(2).loc[character],
+                                "std": character_std.pc_glicko_v.round(3).loc[
+                                    character
+                                ],
                             },
-                            "glicko": {
-                                "top20": self.top_glicko_by_character.get(
-                                    character, []
-                                ),
-                                "r": {
-                                    "qs": character_qs.pc_glicko_r.loc[character]
-                                    .round(0)
-                                    .to_dict(),
-                                    "std": character_std.pc_glicko_r.round(2).loc[
-                                        character
-                                    ],
-                                },
-                                "rd": {
-                                    "qs": character_qs.pc_glicko_rd.loc[character]
-                                    .round(2)
-                                    .to_dict(),
-                                    "std": character_std.pc_glicko_rd.round(3).loc[
-                                        character
-                                    ],
-                                },
-                                "v": {
-                                    "qs": character_qs.pc_glicko_v.loc[character]
-                                    .round(2)
-                                    .to_dict(),
-                                    "std": character_std.pc_glicko_v.round(3).loc[
-                                        character
-                                    ],
-                                },
-                            },
-                        }
-                        for character in self.model.data_.matchup__character_1.dtype.categories.values
-                    },
+                        },
+                    }
+                    for character in self.model.data_.matchup__character_1.dtype.categories.values
                 },
-                outfile,
-                indent=2,
-                sort_keys=True,
-                ignore_nan=True,
-            )
+            },
+        )
+
+    def mean_and_std(self, name, **labels):
+        """
+        Posterior mean and std of ``name`` at arrays of coordinate labels, as
+        numpy arrays.
+        """
+        summary = self.posterior_summary
+        return (
+            summary.lookup(name, **labels),
+            summary.lookup(name, "std", **labels),
+        )
 
     def render_matchup_data(self):
         print("Computing matchup dict")
         matchup_dict = defaultdict(dict)
-        mu_means = self.model.inf_data_["posterior"].mu.mean(["chain", "draw"])
-        mu_std = self.model.inf_data_["posterior"].mu.std(["chain", "draw"])
+        matchups = self.model.data_.matchup__mup.dtype.categories.values
+        # Games are coded with character_1 <= character_2, so matchup codes
+        # count the games with exactly that pair of characters
+        counts = self.category_counts["matchup__mup"]
+        mu_means, mu_std = self.mean_and_std("mu", matchup=matchups)
 
-        for matchup in self.model.data_.matchup__mup.dtype.categories.values:
+        for matchup, count, mean, std in zip(matchups, counts, mu_means, mu_std):
             c1, c2 = matchup.split("-")
-            count = len(
-                self.model.data_.loc[
-                    (self.model.data_.matchup__character_1 == c1)
-                    & (self.model.data_.matchup__character_2 == c2)
-                ]
-            )
             if count > 0:
                 matchup_dict[c1][c2] = {
-                    "mean": round(float(mu_means.loc[matchup]), 2),
-                    "std": round(float(mu_std.loc[matchup]), 2),
-                    "count": count,
+                    "mean": round(float(mean), 2),
+                    "std": round(float(std), 2),
+                    "count": int(count),
                 }
                 if c1 != c2:
                     matchup_dict[c2][c1] = {
@@ -684,77 +1333,66 @@ class YomiRender:
                     }
 
         os.makedirs(self.data_root, exist_ok=True)
-        with open(f"{self.data_root}/matchupData.json", "w") as outfile:
-            simplejson.dump(
-                matchup_dict,
-                outfile,
-                indent=2,
-                sort_keys=True,
-                ignore_nan=True,
-            )
-
-    def render_gem_effects(self):
-        print("Computing matchup dict")
-        with_gem_means = self.model.inf_data_["posterior"].with_gem.mean(
-            ["chain", "draw"]
+        self.write_json(
+            f"{self.data_root}/matchupData.json",
+            matchup_dict,
         )
-        with_gem_std = self.model.inf_data_["posterior"].with_gem.std(["chain", "draw"])
-        against_gem_means = self.model.inf_data_["posterior"].against_gem.mean(
-            ["chain", "draw"]
-        )
-        against_gem_std = self.model.inf_data_["posterior"].against_gem.std(
-            ["chain", "draw"]
+
+    def either_side_counts(self, prefix):
+        """
+        Number of games in which each category of ``{prefix}_1`` appears in
+        either ``{prefix}_1`` or ``{prefix}_2``.
+        """
+        side_1 = self.model.data_[f"{prefix}_1"]
+        side_2 = self.model.data_[f"{prefix}_2"]
+        return (
+            self.category_counts[f"{prefix}_1"]
+            + self.category_counts[f"{prefix}_2"]
+            - _category_counts(side_1.where(side_1 == side_2))
         )
 
+    def render_gem_effects(self):
+        print("Computing matchup dict")
         gems = {"with_gem": defaultdict(dict), "against_gem": defaultdict(dict)}
-        for with_gem in self.model.data_.gem__with_gem_1.dtype.categories.values:
+
+        with_gems = self.model.data_.gem__with_gem_1.dtype.categories.values
+        with_gem_means, with_gem_std = self.mean_and_std(
+            "with_gem", with_gem_c=with_gems
+        )
+        for with_gem, count, mean, std in zip(
+            with_gems,
+            self.either_side_counts("gem__with_gem"),
+            with_gem_means,
+            with_gem_std,
+        ):
             c, g = with_gem.split("-")
-            count = len(
-                self.model.data_.loc[
-                    (
-                        (self.model.data_.gem__character_1 == c)
-                        & (self.model.data_.gem__gem_1 == g)
-                    )
-                    | (
-                        (self.model.data_.gem__character_2 == c)
-                        & (self.model.data_.gem__gem_2 == g)
-                    )
-                ]
-            )
             if count > 0:
                 gems["with_gem"][c][g] = {
-                    "mean": round(float(with_gem_means.loc[with_gem]), 2),
-                    "std": round(float(with_gem_std.loc[with_gem]), 2),
-                    "count": count,
+                    "mean": round(float(mean), 2),
+                    "std": round(float(std), 2),
+                    "count": int(count),
                 }
 
-        for against_gem in self.model.data_.gem__against_gem_1.dtype.categories.values:
+        against_gems = self.model.data_.gem__against_gem_1.dtype.categories.values
+        against_gem_means, against_gem_std = self.mean_and_std(
+            "against_gem", against_gem_c=against_gems
+        )
+        for against_gem, count, mean, std in zip(
+            against_gems,
+            self.either_side_counts("gem__against_gem"),
+            against_gem_means,
+            against_gem_std,
+        ):
             g, c = against_gem.split("-")
-            count = len(
-                self.model.data_.loc[
-                    (
-                        (self.model.data_.gem__character_2 == c)
-                        & (self.model.data_.gem__gem_1 == g)
-                    )
-                    | (
-                        (self.model.data_.gem__character_1 == c)
-                        & (self.model.data_.gem__gem_2 == g)
-                    )
-                ]
-            )
             if count > 0:
                 gems["against_gem"][g][c] = {
-                    "mean": round(float(against_gem_means.loc[against_gem]), 2),
-                    "std": round(float(against_gem_std.loc[against_gem]), 2),
-                    "count": count,
+                    "mean": round(float(mean), 2),
+                    "std": round(float(std), 2),
+                    "count": int(count),
                 }
 
         os.makedirs(self.data_root, exist_ok=True)
-        with open(f"{self.data_root}/gemEffects.json", "w") as outfile:
-            simplejson.dump(
-                gems,
-                outfile,
-                indent=2,
-                sort_keys=True,
-                ignore_nan=True,
-            )
+        self.write_json(
+            f"{self.data_root}/gemEffects.json",
+            gems,
+        )
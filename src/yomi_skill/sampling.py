@@ -0,0 +1,253 @@
+import logging
+from datetime import datetime
+from functools import partial
+
+import arviz
+import jax
+import jax.numpy as jnp
+import numpy
+import pymc as pm
+from jax.flatten_util import ravel_pytree
+from pymc.backends.arviz import coords_and_dims_for_inferencedata, find_observations
+from pymc.sampling.jax import get_jaxified_graph, get_jaxified_logp
+from pymc.util import get_default_varnames
+
+logger = logging.getLogger(__name__)
+
+
+def warm_start_state(model, warm_start, chains):
+    """
+    Starting positions, step size and diagonal inverse mass matrix for
+    sampling ``model`` seeded from the posterior of a previous run, or None if
+    that posterior doesn't have the same unconstrained parameters or wasn't
+    sampled with NUTS (approximate posteriors are too narrow to adapt from).
+    """
+    posterior = warm_start["posterior"]
+    inference = posterior.attrs.get("inference")
+    if inference != "nuts":
+        logger.info(f"Can't warm start from a {inference or 'unknown'} posterior")
+        return None
+    initial_point = model.initial_point()
+
+    position = []
+    variances = []
+    for value_var in model.value_vars:
+        name = value_var.name
+        if (
+            name not in posterior
+            or posterior[name].shape[2:] != initial_point[name].shape
+        ):
+            logger.info(f"Can't warm start: {name} is missing or has changed shape")
+            return None
+
+        draws = posterior[name].to_numpy()
+        # Start each chain from the last draw of a previous chain, going back
+        # a draw each time they run out, so that no two chains start together
+        chain_idx = numpy.arange(chains) % draws.shape[0]
+        draw_idx = -1 - numpy.arange(chains) // draws.shape[0]
+        position.append(draws[chain_idx, draw_idx])
+
+        # Regularized the same way as blackjax's window adaptation
+        n_draws = draws.shape[0] * draws.shape[1]
+        variance = draws.reshape(n_draws, -1).var(axis=0)
+        variances.append(
+            (n_draws / (n_draws + 5)) * variance + 1e-3 * (5 / (n_draws + 5))
+        )
+
+    if "sample_stats" in warm_start and "step_size" in warm_start["sample_stats"]:
+        step_size = float(warm_start["sample_stats"].step_size.median())
+    else:
+        step_size = 1.0
+
+    return position, step_size, numpy.concatenate(variances)
+
+
+@partial(jax.jit, static_argnames=("logdensity_fn", "tune", "draws", "target_accept"))
+def _warm_inference_loop(
+    seed,
+    position,
+    step_size,
+    inverse_mass_matrix,
+    logdensity_fn,
+    tune,
+    draws,
+    target_accept,
+):
+    import blackjax
+
+    da_init, da_update, da_final = (
+        blackjax.adaptation.step_size.dual_averaging_adaptation(target_accept)
+    )
+    state = blackjax.nuts(logdensity_fn, step_size, inverse_mass_matrix).init(position)
+
+    # Keep the mass matrix, and only re-tune the step size
+    def adapt_step(carry, rng_key):
+        state, da_state = carry
+        kernel = blackjax.nuts(
+            logdensity_fn, jnp.exp(da_state.log_step_size), inverse_mass_matrix
+        )
+        state, info = kernel.step(rng_key, state)
+        return (state, da_update(da_state, info.acceptance_rate)), None
+
+    tune_key, draw_key = jax.random.split(seed)
+    if tune > 0:
+        (state, da_state), _ = jax.lax.scan(
+            adapt_step,
+            (state, da_init(step_size)),
+            jax.random.split(tune_key, tune),
+        )
+        step_size = da_final(da_state)
+
+    kernel = blackjax.nuts(logdensity_fn, step_size, inverse_mass_matrix)
+
+    def one_step(state, rng_key):
+        state, info = kernel.step(rng_key, state)
+        return state, (state, info)
+
+    _, (states, infos) = jax.lax.scan(
+        one_step, state, jax.random.split(draw_key, draws)
+    )
+    return states, infos, step_size
+
+
+def sample_warm_blackjax_nuts(
+    model,
+    position,
+    step_size,
+    inverse_mass_matrix,
+    tune=50,
+    draws=1000,
+    target_accept=0.8,
+    random_seed=None,
+    chain_method="parallel",
+    idata_kwargs=None,
+):
+    """
+    Sample ``model`` with NUTS from already-adapted starting positions, step
+    size and mass matrix (see ``warm_start_state``), re-tuning only the step
+    size for ``tune`` steps. Chains run across XLA devices with
+    ``chain_method="parallel"``, or vectorized on one with ``"vectorized"``.
+    """
+    chains = len(position[0])
+    if random_seed is None:
+        random_seed = numpy.random.default_rng().integers(2**31)
+    keys = jax.random.split(jax.random.PRNGKey(random_seed), chains)
+
+    loop = partial(
+        _warm_inference_loop,
+        logdensity_fn=get_jaxified_logp(model),
+        tune=tune,
+        draws=draws,
+        target_accept=target_accept,
+    )
+
+    start = datetime.now()
+    if chain_method == "parallel":
+        map_chains = jax.pmap
+    elif chain_method == "vectorized":
+        map_chains = jax.vmap
+    else:
+        raise ValueError(f"Unknown chain method {chain_method!r}")
+    states, infos, step_sizes = map_chains(loop, in_axes=(0, 0, None, None))(
+        keys, position, step_size, inverse_mass_matrix
+    )
+    logger.info(f"Warm-started sampling time = {datetime.now() - start}")
+
+    return _inference_data(
+        model,
+        states.position,
+        sample_stats={
+            "lp": numpy.asarray(states.logdensity),
+            "diverging": numpy.asarray(infos.is_divergent),
+            "energy": numpy.asarray(infos.energy),
+            "tree_depth": numpy.asarray(infos.num_trajectory_expansions),
+            "n_steps": numpy.asarray(infos.num_integration_steps),
+            "acceptance_rate": numpy.asarray(infos.acceptance_rate),
+            "step_size": numpy.broadcast_to(
+                numpy.asarray(step_sizes)[:, None], (chains, draws)
+            ),
+        },
+        idata_kwargs=idata_kwargs,
+    )
+
+
+def fit_advi(model, n=20000, draws=1000, random_seed=None, idata_kwargs=None):
+    """
+    Approximate the posterior of ``model`` with mean-field ADVI (stopping
+    early once its parameters converge), and draw
+    ``draws`` samples from the approximation as a single chain.
+    """
+    approx = pm.fit(
+        n=n,
+        method="advi",
+        model=model,
+        random_seed=random_seed,
+        callbacks=[pm.callbacks.CheckParametersConvergence(diff="absolute")],
+        progressbar=False,
+    )
+    return approx.sample(
+        draws, random_seed=random_seed, include_transformed=True, **(idata_kwargs or {})
+    )
+
+
+def fit_laplace(model, draws=1000, random_seed=None, idata_kwargs=None):
+    """
+    Approximate the posterior of ``model`` with a normal distribution centered
+    on the MAP estimate in the unconstrained space, with covariance from the
+    inverse Hessian of the log density there, and draw ``draws`` samples from
+    it as a single chain.
+    """
+    map_point = pm.find_MAP(model=model, progressbar=False)
+    mode, unravel = ravel_pytree([map_point[var.name] for var in model.value_vars])
+    mode = numpy.asarray(mode)
+
+    logdensity_fn = get_jaxified_logp(model)
+
+    def flat_logdensity(flat):
+        return logdensity_fn(unravel(flat))
+
+    start = datetime.now()
+    precision = -numpy.asarray(jax.jit(jax.hessian(flat_logdensity))(mode))
+    logger.info(f"Laplace Hessian time = {datetime.now() - start}")
+
+    # Clip non-positive curvature (e.g. from flat directions) so that the
+    # covariance stays well defined
+    eigenvalues, eigenvectors = numpy.linalg.eigh((precision + precision.T) / 2)
+    eigenvalues = numpy.maximum(eigenvalues, 1e-6)
+
+    rng = numpy.random.default_rng(random_seed)
+    noise = rng.standard_normal((draws, len(eigenvalues)))
+    flat_draws = jnp.asarray(mode + (noise / numpy.sqrt(eigenvalues)) @ eigenvectors.T)
+    return _inference_data(
+        model,
+        [position[None] for position in jax.vmap(unravel)(flat_draws)],
+        sample_stats={
+            "lp": numpy.asarray(jax.jit(jax.vmap(flat_logdensity))(flat_draws))[None]
+        },
+        idata_kwargs=idata_kwargs,
+    )
+
+
+def _inference_data(model, positions, sample_stats, idata_kwargs=None):
+    # ``positions`` holds (chain, draw, ...) arrays of the model's value
+    # variables. Keep the unconstrained values, so that this run can seed the
+    # next one
+    vars_to_sample = list(
+        get_default_varnames(model.unobserved_value_vars, include_transformed=True)
+    )
+    transform = get_jaxified_graph(inputs=model.value_vars, outputs=vars_to_sample)
+    samples = jax.jit(jax.vmap(jax.vmap(transform)))(*positions)
+
+    coords, dims = coords_and_dims_for_inferencedata(model)
+    coords.update((idata_kwargs or {}).get("coords", {}))
+    dims.update((idata_kwargs or {}).get("dims", {}))
+    return arviz.from_dict(
+        posterior={
+            var.name: numpy.asarray(sample)
+            for var, sample in zip(vars_to_sample, samples)
+        },
+        sample_stats=sample_stats,
+        observed_data=find_observations(model),
+        coords=coords,
+        dims=dims,
+    )
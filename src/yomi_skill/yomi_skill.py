@@ -37,7 +37,20 @@ from sklearn import set_config
 
 set_config(transform_output="pandas")
 
-from .models.pymc_model import PyMCModel
+from .models.pymc_model import INFERENCE_METHODS, PyMCModel
+from .posterior_cache import DEFAULT_CACHE_DIR
+from .rating_cache import RatingCache, prefit_key
+
+
+def check_compressions(ctx, param, value):
+    # Fail before fitting, rather than when the first file is written
+    if "br" in value:
+        try:
+            import brotli
+        except ImportError:
+            raise click.BadParameter("br compression needs the brotli package")
+    return value
+
 
 MODELS = {
     model.model_name: model
@@ -69,40 +82,92 @@ def yomi2():
 )
 @click.option("--warmup", type=int, default=500)
 @click.option("--samples", type=int, default=1000)
-def render(min_games, model, warmup, samples):
+@click.option("--aggregate/--no-aggregate", default=False)
+@click.option("--posterior-cache/--no-posterior-cache", default=True)
+@click.option("--warm-start/--no-warm-start", default=False)
+@click.option(
+    "--inference", type=click.Choice(INFERENCE_METHODS), default=INFERENCE_METHODS[0]
+)
+@click.option("--chains", type=int, default=4)
+@click.option(
+    "--chain-method", type=click.Choice(["parallel", "vectorized"]), default="parallel"
+)
+@click.option("--split-samples/--no-split-samples", default=False)
+@click.option("--jobs", type=int, default=None)
+@click.option("--output-format", type=click.Choice(OUTPUT_FORMATS), default="records")
+@click.option(
+    "--compress",
+    type=click.Choice(COMPRESSIONS),
+    multiple=True,
+    callback=check_compressions,
+)
+@click.option("--incremental/--no-incremental", default=True)
+@click.option("--render-workers", type=int, default=None)
+def render(
+    min_games,
+    model,
+    warmup,
+    samples,
+    aggregate,
+    posterior_cache,
+    warm_start,
+    inference,
+    chains,
+    chain_method,
+    split_samples,
+    jobs,
+    output_format,
+    compress,
+    incremental,
+    render_workers,
+):
     tournament_games = yomi.latest_tournament_games()
     sirlin_games = yomi.sirlin_db()
     games = pandas.concat([tournament_games, sirlin_games]).reset_index(drop=True)
     hist_games = yomi.augment_dataset(games)
 
-    pipeline = (
-        MODELS[model]
-        .pipeline(
-            rating_periods__player__kw_args=dict(field_prefix="player", threshold=1),
-            rating_periods__player_character__kw_args=dict(
-                field_prefix="player_character", threshold=3
-            ),
-            transform__glicko__initial_time=hist_games.match_date.min(),
-            transform__pc_glicko__initial_time=hist_games.match_date.min(),
-            model__min_games=min_games,
-            model__warmup=warmup,
-            model__samples=samples,
-            # transform__elo__default_k=16,
-            # transform__pc_elo__default_k=1,
-            transform__glicko__initial_value=(1500.0, 50, 0.059),
-            transform__pc_glicko__initial_value=(1500.0, 40, 0.027),
-            # transform__elo__rating_factor=1135.77,  # 200-point rating difference corresponds to 60% win chance
-        )
-        .fit(hist_games, hist_games.win)
+    pipeline = MODELS[model].pipeline(
+        n_jobs=jobs,
+        rating_periods__player__kw_args=dict(field_prefix="player", threshold=1),
+        rating_periods__player_character__kw_args=dict(
+            field_prefix="player_character", threshold=3
+        ),
+        transform__glicko__initial_time=hist_games.match_date.min(),
+        transform__pc_glicko__initial_time=hist_games.match_date.min(),
+        model__min_games=min_games,
+        model__warmup=warmup,
+        model__inference=inference,
+        model__chains=chains,
+        model__chain_method=chain_method,
+        model__split_samples=split_samples,
+        model__samples=samples,
+        model__aggregate=aggregate,
+        model__posterior_cache=DEFAULT_CACHE_DIR if posterior_cache else None,
+        # transform__elo__default_k=16,
+        # transform__pc_elo__default_k=1,
+        transform__glicko__initial_value=(1500.0, 50, 0.059),
+        transform__pc_glicko__initial_value=(1500.0, 40, 0.027),
+        # transform__elo__rating_factor=1135.77,  # 200-point rating difference corresponds to 60% win chance
+    )
+    pipeline.fit(
+        hist_games,
+        hist_games.win,
+        model__warm_start=(
+            pipeline["model"].latest_cached_posterior() if warm_start else None
+        ),
     )
 
-    render = YomiRender(pipeline, "src-js/data/yomi")
-    render.render_aggregate_skill()
-    render.render_players()
-    render.render_characters()
-    render.render_matchup_data()
-    render.render_player_details()
-    render.render_scales()
+    render = YomiRender(
+        pipeline,
+        "src-js/data/yomi",
+        output_format=output_format,
+        compress=compress,
+        incremental=incremental,
+    )
+    render.run_steps(YOMI1_RENDER_STEPS, workers=render_workers, n_jobs=jobs)
+    render.write_manifest()
+    render.report_output()
+    render.report_timings()
 
 
 @yomi2.command()
@@ -112,54 +177,127 @@ def render(min_games, model, warmup, samples):
 )
 @click.option("--warmup", type=int, default=500)
 @click.option("--samples", type=int, default=1000)
-def render(min_games, model, warmup, samples):
-    y1_tournament_games = yomi.latest_tournament_games()
-    y1_sirlin_games = yomi.sirlin_db()
-    y1_games = pandas.concat([y1_tournament_games, y1_sirlin_games]).reset_index(
-        drop=True
-    )
-    y1_games = yomi.augment_dataset(y1_games)
-
+@click.option("--aggregate/--no-aggregate", default=False)
+@click.option("--posterior-cache/--no-posterior-cache", default=True)
+@click.option("--warm-start/--no-warm-start", default=False)
+@click.option(
+    "--inference", type=click.Choice(INFERENCE_METHODS), default=INFERENCE_METHODS[0]
+)
+@click.option("--chains", type=int, default=4)
+@click.option(
+    "--chain-method", type=click.Choice(["parallel", "vectorized"]), default="parallel"
+)
+@click.option("--split-samples/--no-split-samples", default=False)
+@click.option("--jobs", type=int, default=None)
+@click.option("--output-format", type=click.Choice(OUTPUT_FORMATS), default="records")
+@click.option(
+    "--compress",
+    type=click.Choice(COMPRESSIONS),
+    multiple=True,
+    callback=check_compressions,
+)
+@click.option("--incremental/--no-incremental", default=True)
+@click.option("--render-workers", type=int, default=None)
+@click.option("--rating-cache/--no-rating-cache", default=True)
+@click.option("--refresh-yomi1/--no-refresh-yomi1", default=False)
+def render(
+    min_games,
+    model,
+    warmup,
+    samples,
+    aggregate,
+    posterior_cache,
+    warm_start,
+    inference,
+    chains,
+    chain_method,
+    split_samples,
+    jobs,
+    output_format,
+    compress,
+    incremental,
+    render_workers,
+    rating_cache,
+    refresh_yomi1,
+):
     y2_games = games_yomi2.latest_tournament_games()
     y2_games = games_yomi2.augment_dataset(y2_games)
 
     print(y2_games)
 
-    pipeline = (
-        MODELS[model]
-        .pipeline(
-            rating_periods__player__kw_args=dict(field_prefix="player", threshold=1),
-            rating_periods__player_character__kw_args=dict(
-                field_prefix="player_character", threshold=3
-            ),
-            transform__glicko__initial_time=pandas.concat(
-                [y1_games, y2_games]
-            ).match_date.min(),
-            transform__pc_glicko__initial_time=pandas.concat(
-                [y1_games, y2_games]
-            ).match_date.min(),
-            model__min_games=min_games,
-            model__warmup=warmup,
-            model__samples=samples,
-            # transform__elo__default_k=16,
-            # transform__pc_elo__default_k=1,
-            transform__glicko__initial_value=(1500.0, 50, 0.059),
-            transform__pc_glicko__initial_value=(1500.0, 40, 0.027),
-            # transform__elo__rating_factor=1135.77,  # 200-point rating difference corresponds to 60% win chance
-            verbose=True,
-            prefit_games=y1_games,
+    rating_params = dict(
+        rating_periods__player__kw_args=dict(field_prefix="player", threshold=1),
+        rating_periods__player_character__kw_args=dict(
+            field_prefix="player_character", threshold=3
+        ),
+        transform__glicko__initial_value=(1500.0, 50, 0.059),
+        transform__pc_glicko__initial_value=(1500.0, 40, 0.027),
+    )
+
+    # The Yomi 1 history is frozen, so the ratings prefit on it only need
+    # recomputing when the inputs or the rating code change
+    y1_tournament_games = yomi.frozen_tournament_games(refresh=refresh_yomi1)
+    cache = RatingCache() if rating_cache else None
+    cache_key = prefit_key(y1_tournament_games, yomi.SIRLIN_DB, rating_params)
+    prefit_ratings = cache.get(cache_key) if cache is not None else None
+    if prefit_ratings is None:
+        y1_sirlin_games = yomi.sirlin_db()
+        y1_games = pandas.concat([y1_tournament_games, y1_sirlin_games]).reset_index(
+            drop=True
+        )
+        y1_games = yomi.augment_dataset(y1_games)
+        initial_time = pandas.concat([y1_games, y2_games]).match_date.min()
+        prefit_ratings = MODELS[model].prefit_ratings(
+            y1_games,
+            n_jobs=jobs,
+            transform__glicko__initial_time=initial_time,
+            transform__pc_glicko__initial_time=initial_time,
+            **rating_params,
         )
-        .fit(y2_games, y2_games.win)
+        if cache is not None:
+            cache.put(cache_key, prefit_ratings)
+    else:
+        initial_time = y2_games.match_date.min()
+
+    pipeline = MODELS[model].pipeline(
+        n_jobs=jobs,
+        **rating_params,
+        transform__glicko__initial_time=initial_time,
+        transform__pc_glicko__initial_time=initial_time,
+        model__min_games=min_games,
+        model__warmup=warmup,
+        model__inference=inference,
+        model__chains=chains,
+        model__chain_method=chain_method,
+        model__split_samples=split_samples,
+        model__samples=samples,
+        model__aggregate=aggregate,
+        model__posterior_cache=DEFAULT_CACHE_DIR if posterior_cache else None,
+        # transform__elo__default_k=16,
+        # transform__pc_elo__default_k=1,
+        # transform__elo__rating_factor=1135.77,  # 200-point rating difference corresponds to 60% win chance
+        verbose=True,
+        prefit_ratings=prefit_ratings,
+    )
+    pipeline.fit(
+        y2_games,
+        y2_games.win,
+        model__warm_start=(
+            pipeline["model"].latest_cached_posterior() if warm_start else None
+        ),
     )
 
-    render = YomiRender(pipeline, "src-js/data/yomi2")
-    render.render_aggregate_skill()
-    render.render_players()
-    render.render_characters()
-    render.render_matchup_data()
-    render.render_player_details()
-    render.render_scales()
-    render.render_gem_effects()
+    render = YomiRender(
+        pipeline,
+        "src-js/data/yomi2",
+        output_format=output_format,
+        compress=compress,
+        incremental=incremental,
+    )
+    render.run_steps(YOMI2_RENDER_STEPS, workers=render_workers, n_jobs=jobs)
+    render.write_manifest()
+    render.report_output()
+    render.report_timings()
 
 
 if __name__ == "__main__":